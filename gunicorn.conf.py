@@ -0,0 +1,19 @@
+import os
+
+# Import the site once in the master instead of in every worker, see
+# polls.preload. Set GUNICORN_PRELOAD=0 to load it per worker, which
+# --reload needs.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+
+def when_ready(server):
+    # the master has loaded the site by now when preloading
+    if server.cfg.preload_app:
+        from polls.preload import preload
+        preload()
+
+
+def worker_exit(server, worker):
+    # write out any votes still waiting in the worker's vote buffer
+    from polls.buffer import shutdown
+    shutdown()
@@ -0,0 +1,182 @@
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from polls.cache import vote_stamp
+from polls.charts import choice_color
+from polls.history import RESOLUTIONS, get_history
+from polls.models import Poll, Choice
+from polls.parsers import NDJSONParser
+from polls.renderers import NDJSONRenderer, render_line
+from polls.serializers import (
+    HistoryQuerySerializer,
+    PollListQuerySerializer,
+    PollSerializer,
+)
+from polls.views import cache_poll_detail, get_poll_detail, get_result_choices
+
+# The API views, kept apart from polls.views so rest_framework is only
+# imported once the first API request comes in, see polls.urls.
+
+
+def stream_polls(polls, cursor, batch_size):
+    # walk the polls in id order one batch at a time so memory stays flat
+    while True:
+        batch = list(polls.filter(id__gt=cursor).with_choices()[:batch_size])
+        if not batch:
+            return
+        for poll in PollSerializer(batch, many=True).data:
+            yield render_line(poll)
+        cursor = batch[-1].id
+
+
+class PollsListAPIView(APIView):
+    renderer_classes = (
+        list(api_settings.DEFAULT_RENDERER_CLASSES) + [NDJSONRenderer]
+    )
+
+    def get(self, request):
+        query = PollListQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = query.validated_data
+
+        polls = Poll.objects.order_by('id')
+        if 'created_after' in params:
+            polls = polls.filter(pub_date__gt=params['created_after'])
+        if 'min_votes' in params:
+            polls = polls.filter(total_votes__gte=params['min_votes'])
+
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            return StreamingHttpResponse(
+                stream_polls(polls, params['cursor'], params['limit']),
+                content_type=NDJSONRenderer.media_type
+            )
+
+        limit = params['limit']
+        page = list(
+            polls.filter(id__gt=params['cursor']).with_choices()[:limit + 1]
+        )
+        next_url = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'cursor', page[-1].id
+            )
+        return Response({
+            'next': next_url,
+            'results': PollSerializer(page, many=True).data,
+        })
+
+    def post(self, request):
+        serializer = PollSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PollsBulkAPIView(APIView):
+    parser_classes = (JSONParser, NDJSONParser)
+
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {'non_field_errors': ['Expected a list of polls']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        valid, errors = [], []
+        for index, item in enumerate(request.data):
+            serializer = PollSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+
+        created = []
+        batch_size = settings.POLLS_BULK_BATCH_SIZE
+        for start in range(0, len(valid), batch_size):
+            batch = valid[start:start + batch_size]
+            polls = PollSerializer(many=True).create(
+                [data for _, data in batch]
+            )
+            created.extend(
+                {'index': index, 'id': poll.id, 'uid': poll.uid}
+                for (index, _), poll in zip(batch, polls)
+            )
+
+        return Response(
+            {'created': created, 'errors': errors},
+            status=(
+                status.HTTP_201_CREATED if created
+                else status.HTTP_400_BAD_REQUEST
+            )
+        )
+
+
+class PollDetailAPIView(APIView):
+
+    def get(self, request, uid):
+        data, etag = get_poll_detail(uid)
+        response = get_conditional_response(request, etag=etag)
+        return cache_poll_detail(response or Response(data), etag)
+
+
+class PollResultsAPIView(APIView):
+    # just what a browser needs to draw the results chart itself
+
+    def get(self, request, uid):
+        choices = get_result_choices(uid)
+        etag = f'"{vote_stamp((c.id, c.current_votes) for c in choices)}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response({
+                'total': sum(choice.current_votes for choice in choices),
+                'choices': [
+                    {
+                        'id': choice.id,
+                        'text': choice.text,
+                        'votes': choice.current_votes,
+                        'color': choice_color(i),
+                    }
+                    for i, choice in enumerate(choices)
+                ],
+            })
+        return cache_poll_detail(response, etag)
+
+
+class PollHistoryAPIView(APIView):
+
+    def get(self, request, uid):
+        query = HistoryQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = query.validated_data
+        choices = list(
+            Choice.objects.filter(poll__uid=uid).order_by('id').values(
+                'id', 'text'
+            )
+        )
+        if not choices:
+            raise Http404('Poll not found')
+        resolution = RESOLUTIONS[params['resolution']]
+        response = Response({
+            'resolution': params['resolution'],
+            'since': params['since'],
+            'until': params['until'],
+            'choices': choices,
+            'series': get_history(
+                uid, resolution, params['since'], params['until']
+            ),
+        })
+        # the newest bucket is still counting, so only cache for a bucket
+        patch_cache_control(
+            response, public=True, max_age=min(resolution, 60)
+        )
+        return response
@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class PollsConfig(AppConfig):
     name = 'polls'
+
+    def ready(self):
+        from polls.timing import time_queries
+        connection_created.connect(time_queries)
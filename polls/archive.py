@@ -0,0 +1,112 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from polls.models import ArchivedPoll, Choice, ChoiceShard, Poll
+
+
+def stale_polls(before):
+    # polls never voted on count from when they were published
+    return Poll.objects.filter(
+        Q(last_vote__lt=before) |
+        Q(last_vote__isnull=True, pub_date__lt=before)
+    )
+
+
+def pack(poll, choices):
+    return ArchivedPoll(
+        id=poll.id,
+        uid=poll.uid,
+        text=poll.text,
+        pub_date=poll.pub_date,
+        total_votes=poll.total_votes,
+        last_vote=poll.last_vote,
+        choices=[
+            {'id': choice_id, 'text': text, 'votes': votes}
+            for choice_id, text, votes in choices
+        ]
+    )
+
+
+def archive_batch(ids, before):
+    # choices are locked before their polls, in the order votes lock them,
+    # and polls that got a vote since they were picked are left alone
+    with transaction.atomic():
+        rows = Choice.objects.select_for_update().filter(
+            poll_id__in=ids
+        ).order_by('id').values_list('id', 'poll_id', 'text', 'votes')
+        choices = {}
+        for choice_id, poll_id, text, votes in rows:
+            choices.setdefault(poll_id, []).append((choice_id, text, votes))
+        pending = set(
+            ChoiceShard.objects.select_for_update().filter(
+                choice__poll_id__in=ids,
+                votes__gt=0
+            ).values_list('choice__poll_id', flat=True)
+        )
+        polls = list(
+            stale_polls(before).select_for_update().filter(
+                id__in=ids
+            ).exclude(id__in=pending).order_by('id')
+        )
+        ArchivedPoll.objects.bulk_create([
+            pack(poll, choices.get(poll.id, [])) for poll in polls
+        ])
+        # takes the choices, shards, fingerprints and vote history with it
+        Poll.objects.filter(id__in=[poll.id for poll in polls]).delete()
+    cache.delete_many([f'polls:poll:{poll.uid}' for poll in polls])
+    return len(polls)
+
+
+def archive_polls(now=None, batch_size=100, pause=0):
+    # each batch is its own short transaction, pause gives votes and
+    # replication some room between them
+    now = now or timezone.now()
+    before = now - timedelta(seconds=settings.POLLS_ARCHIVE['AFTER'])
+    archived = 0
+    last_id = 0
+    while True:
+        ids = list(
+            stale_polls(before).filter(id__gt=last_id).order_by(
+                'id'
+            ).values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return archived
+        archived += archive_batch(ids, before)
+        last_id = ids[-1]
+        if pause:
+            time.sleep(pause)
+
+
+def unpack(archived):
+    # an unsaved poll and choices to render, ranked like results pages
+    poll = Poll(
+        id=archived.id,
+        uid=archived.uid,
+        text=archived.text,
+        pub_date=archived.pub_date,
+        total_votes=archived.total_votes,
+        last_vote=archived.last_vote
+    )
+    poll.archived = True
+    choices = [
+        Choice(
+            id=choice['id'],
+            poll=poll,
+            text=choice['text'],
+            votes=choice['votes']
+        )
+        for choice in archived.choices
+    ]
+    for choice in choices:
+        choice.current_votes = choice.votes
+    choices.sort(key=lambda choice: (-choice.current_votes, choice.id))
+    return poll, choices
+
+
+def get_archived_results(uid):
+    return unpack(ArchivedPoll.objects.get(uid=uid))
@@ -0,0 +1,16 @@
+from django.urls import path
+from polls import async_views
+
+urlpatterns = [
+    path('poll/<uid>', async_views.poll_view, name='poll'),
+    path(
+        'poll/<uid>/results',
+        async_views.results_view,
+        name='results'
+    ),
+    path(
+        'api/v1/poll/<uid>',
+        async_views.poll_detail_api,
+        name='api_poll_detail'
+    ),
+]
@@ -0,0 +1,57 @@
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.contrib import messages
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
+from polls import views
+
+# Async versions of the busiest views for the ASGI deployment. These are
+# functions because Django only runs class based views asynchronously
+# from 4.1 on. The ORM and templates are synchronous, so that work runs
+# in a thread while the event loop keeps serving other voters.
+
+
+def in_pool(func):
+    # Django 3.2 runs every thread sensitive call of the process on one
+    # thread, so votes and pages would queue behind each other. They go
+    # to the event loop's thread pool instead, and as these threads are
+    # outside the request they tidy up their own connections.
+    def run(*args):
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+async def poll_view(request, uid):
+    if request.method == 'POST':
+        error = await in_pool(views.cast_vote)(
+            request, uid, request.POST.get('choice_id')
+        )
+        if error:
+            messages.error(request, error)
+        return redirect('results', uid=uid)
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET', 'POST'])
+
+    data = await in_pool(views.get_poll_data_or_404)(uid)
+    return await in_pool(views.poll_page)(request, data)
+
+
+async def results_view(request, uid):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    poll, choices = await in_pool(views.get_results)(uid)
+    return await in_pool(views.results_page)(request, poll, choices)
+
+
+async def poll_detail_api(request, uid):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    data, etag = await in_pool(views.get_poll_detail)(uid)
+    response = get_conditional_response(request, etag=etag)
+    return views.cache_poll_detail(response or JsonResponse(data), etag)
@@ -0,0 +1,29 @@
+import polls.overrides  # noqa: F401
+from polls.benchmarks.charts import Charts
+from polls.benchmarks.connections import Connections
+from polls.benchmarks.endpoints import Endpoints
+from polls.benchmarks.forms import Forms
+from polls.benchmarks.http import HttpLoad
+from polls.benchmarks.imports import BulkImport
+from polls.benchmarks.lookups import UidLookup
+from polls.benchmarks.ratelimit import RateLimit
+from polls.benchmarks.startup import Startup
+from polls.benchmarks.templates import Templates
+from polls.benchmarks.votes import ConcurrentVotes
+
+BENCHMARKS = {
+    benchmark.name: benchmark
+    for benchmark in (
+        BulkImport(),
+        Charts(),
+        ConcurrentVotes(),
+        Connections(),
+        Endpoints(),
+        Forms(),
+        HttpLoad(),
+        RateLimit(),
+        Startup(),
+        Templates(),
+        UidLookup(),
+    )
+}
@@ -0,0 +1,71 @@
+import time
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Timer:
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+class Benchmark:
+    name = None
+    help = ''
+
+    def add_arguments(self, parser):
+        pass
+
+    def run(self, **options):
+        raise NotImplementedError
+
+
+# how each kind of metric is told apart from the parameters of a run,
+# costs regress when they go up and rates when they go down
+COSTS = (
+    '_ms', '_us', '_bytes', 'queries', '_per_request', 'errors', 'lost_votes',
+    'seconds',
+)
+RATES = ('_per_second', 'recorded_votes')
+
+
+def is_metric(name):
+    return name.endswith(COSTS + RATES)
+
+
+def run_key(result):
+    # results compare with the baseline entry run with the same parameters
+    return tuple(
+        (name, value) for name, value in sorted(result.items())
+        if not is_metric(name)
+    )
+
+
+def find_regressions(results, baseline, tolerance):
+    previous_runs = {run_key(previous): previous for previous in baseline}
+    regressions = []
+    for current in results:
+        label = ' '.join(str(value) for _, value in run_key(current))
+        previous = previous_runs.get(run_key(current))
+        if previous is None:
+            # otherwise a run that no longer matches is never compared
+            regressions.append(f'{label}: not in the baseline')
+            continue
+        for name, value in current.items():
+            old = previous.get(name)
+            if not is_metric(name) or old is None:
+                continue
+            change = old - value if name.endswith(RATES) else value - old
+            if change > 0 and change > abs(old) * tolerance:
+                regressions.append(f'{label} {name}: {old} -> {value}')
+    return regressions
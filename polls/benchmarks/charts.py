@@ -0,0 +1,62 @@
+from pygal import Pie
+from polls.benchmarks.base import Benchmark, Timer, percentile
+from polls.charts import choice_color, get_custom_style
+from polls.svg import render_pie
+
+
+def pygal_data_uri(slices):
+    pie_chart = Pie(style=get_custom_style())
+    for text, votes, _ in slices:
+        pie_chart.add(text, votes)
+    return pie_chart.render_data_uri()
+
+
+def pygal_svg(slices):
+    pie_chart = Pie(style=get_custom_style())
+    for text, votes, _ in slices:
+        pie_chart.add(text, votes)
+    return pie_chart.render()
+
+
+RENDERERS = {
+    'pygal_data_uri': pygal_data_uri,
+    'pygal': pygal_svg,
+    'svg': render_pie,
+}
+
+
+class Charts(Benchmark):
+    name = 'charts'
+    help = (
+        'Render the same results chart with pygal and polls.svg and '
+        'report render time and size'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=200)
+        parser.add_argument('--choices', type=int, default=4)
+
+    def run(self, renders, choices, **options):
+        slices = [
+            (f'Choice {i}', (i + 1) * 7, choice_color(i))
+            for i in range(choices)
+        ]
+        return [
+            self.measure(name, renders, slices) for name in sorted(RENDERERS)
+        ]
+
+    def measure(self, name, renders, slices):
+        render = RENDERERS[name]
+        timings = []
+        for _ in range(renders):
+            with Timer() as timer:
+                chart = render(slices)
+            timings.append(timer.elapsed)
+        return {
+            'renderer': name,
+            'choices': len(slices),
+            'renders': renders,
+            'p50_us': round(percentile(timings, 50) * 1e6, 1),
+            'p99_us': round(percentile(timings, 99) * 1e6, 1),
+            'chart_bytes': len(chart),
+        }
@@ -0,0 +1,99 @@
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from polls.benchmarks.base import Benchmark, Timer, percentile
+from polls.benchmarks.data import BENCHMARK_TEXT
+from polls.benchmarks.endpoints import SCENARIOS, local_client
+from polls.models import Poll, Choice
+
+# None keeps connections open for good, 0 closes them after each request
+MODES = {'persistent': None, 'per_request': 0}
+
+
+class Connections(Benchmark):
+    name = 'connections'
+    help = (
+        'Request a page with connections closed after every request and '
+        'with persistent connections, and report how many requests had '
+        'to connect to the database and what connecting costs'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--scenario', choices=sorted(SCENARIOS), default='results_api'
+        )
+
+    def run(self, requests, scenario, **options):
+        poll = Poll.objects.create_unique(text=BENCHMARK_TEXT)
+        choice = Choice.objects.create(poll=poll, text='Choice')
+        connect_ms = self.connect_ms()
+        try:
+            return [
+                dict(
+                    self.measure(mode, scenario, requests, poll, choice),
+                    connect_ms=connect_ms
+                )
+                for mode in sorted(MODES)
+            ]
+        finally:
+            poll.delete()
+
+    def connect_ms(self, samples=20):
+        timings = []
+        for _ in range(samples):
+            connection.close()
+            with Timer() as timer:
+                connection.ensure_connection()
+            timings.append(timer.elapsed)
+        return round(percentile(timings, 50) * 1000, 2)
+
+    def measure(self, mode, scenario, requests, poll, choice):
+        send = SCENARIOS[scenario]
+        client = local_client()
+        connects = []
+
+        def count(sender, **kwargs):
+            if kwargs['connection'].alias == connection.alias:
+                connects.append(kwargs['connection'])
+
+        def opened():
+            # a pool hands out open connections, count the ones it opens
+            pool = getattr(connection, 'pool', None)
+            return pool.opened if pool else len(connects)
+
+        max_age = connection.settings_dict['CONN_MAX_AGE']
+        connection.settings_dict['CONN_MAX_AGE'] = MODES[mode]
+        connection_created.connect(count)
+        timings = []
+        errors = 0
+        try:
+            # CONN_MAX_AGE is read when connecting
+            connection.close()
+            before = opened()
+            for _ in range(requests):
+                # the test client skips the connection handling a real
+                # request does when it starts and finishes
+                with Timer() as timer:
+                    close_old_connections()
+                    response = send(client, poll.uid, choice.id, 0)
+                    close_old_connections()
+                if response.status_code >= 400:
+                    errors += 1
+                timings.append(timer.elapsed)
+            new_connections = opened() - before
+        finally:
+            connection_created.disconnect(count)
+            connection.settings_dict['CONN_MAX_AGE'] = max_age
+            connection.close()
+
+        return {
+            'mode': mode,
+            'engine': connection.settings_dict['ENGINE'],
+            'scenario': scenario,
+            'requests': requests,
+            'errors': errors,
+            'connections_per_request': round(new_connections / requests, 2),
+            'p50_ms': round(percentile(timings, 50) * 1000, 2),
+            'p95_ms': round(percentile(timings, 95) * 1000, 2),
+            'mean_ms': round(sum(timings) * 1000 / requests, 2),
+        }
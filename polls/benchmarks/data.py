@@ -0,0 +1,51 @@
+from django.db.models import Max, Min
+from polls.models import Poll, Choice, short_urltoken
+
+BENCHMARK_TEXT = 'Benchmark poll'
+# real uids come from secrets.token_urlsafe, which never uses a ~, so
+# nobody can make a poll the cleanup would take for a benchmark poll
+BENCHMARK_UID = '~bench-'
+
+
+def benchmark_uid():
+    return BENCHMARK_UID + short_urltoken()
+
+
+def benchmark_polls():
+    return Poll.objects.filter(uid__startswith=BENCHMARK_UID)
+
+
+def generate_polls(count, choices=0, batch_size=5000):
+    # bulk insert benchmark polls, looking ids back up by uid because not
+    # every database returns them from bulk_create
+    while count > 0:
+        size = min(batch_size, count)
+        polls = [
+            Poll(text=f'{BENCHMARK_TEXT} {i}', uid=benchmark_uid())
+            for i in range(size)
+        ]
+        Poll.objects.bulk_create(polls)
+        if choices:
+            poll_ids = Poll.objects.filter(
+                uid__in=[poll.uid for poll in polls]
+            ).values_list('id', flat=True)
+            Choice.objects.bulk_create(
+                Choice(poll_id=poll_id, text=f'Choice {i}')
+                for poll_id in poll_ids
+                for i in range(choices)
+            )
+        count -= size
+
+
+def delete_polls(polls, batch_size=1000):
+    # a range of ids at a time, so each delete only collects the choices
+    # and history of a batch of polls however many there are
+    bounds = polls.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return
+    for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+        polls.filter(id__gte=start, id__lt=start + batch_size).delete()
+
+
+def delete_benchmark_polls(batch_size=1000):
+    delete_polls(benchmark_polls(), batch_size)
@@ -0,0 +1,156 @@
+import random
+import time
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from polls.benchmarks.base import Benchmark, Timer, percentile
+from polls.benchmarks.data import (
+    BENCHMARK_UID,
+    benchmark_polls,
+    generate_polls,
+    delete_benchmark_polls,
+)
+from polls.dedup import VOTER_COOKIE, new_voter_cookie
+from polls.models import Poll, Choice
+
+
+def vote(client, uid, choice_id):
+    # a new voter every time, repeat votes are rejected before any write
+    client.cookies[VOTER_COOKIE] = new_voter_cookie()
+    return client.post(
+        reverse('poll', kwargs={'uid': uid}), {'choice_id': choice_id}
+    )
+
+
+SCENARIOS = {
+    'home': lambda client, uid, choice_id, cursor: client.get(
+        reverse('home')
+    ),
+    'poll': lambda client, uid, choice_id, cursor: client.get(
+        reverse('poll', kwargs={'uid': uid})
+    ),
+    'vote': lambda client, uid, choice_id, cursor: vote(
+        client, uid, choice_id
+    ),
+    'results': lambda client, uid, choice_id, cursor: client.get(
+        reverse('results', kwargs={'uid': uid})
+    ),
+    'results_chart': lambda client, uid, choice_id, cursor: client.get(
+        reverse('results_chart', kwargs={'uid': uid})
+    ),
+    'results_api': lambda client, uid, choice_id, cursor: client.get(
+        reverse('api_poll_results', kwargs={'uid': uid})
+    ),
+    'list_api': lambda client, uid, choice_id, cursor: client.get(
+        reverse('api_polls'), {'cursor': cursor, 'limit': 50}
+    ),
+    'detail_api': lambda client, uid, choice_id, cursor: client.get(
+        reverse('api_poll_detail', kwargs={'uid': uid})
+    ),
+}
+
+
+def local_client():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+    return Client(HTTP_HOST=hosts[0].lstrip('.') if hosts else 'localhost')
+
+
+def sample_choices(count):
+    # (poll uid, choice id) pairs spread over the benchmark polls
+    choices = Choice.objects.filter(poll__uid__startswith=BENCHMARK_UID)
+    bounds = choices.aggregate(low=Min('id'), high=Max('id'))
+    return [
+        choices.filter(
+            id__gte=random.randint(bounds['low'], bounds['high'])
+        ).order_by('id').values_list('poll__uid', 'id')[0]
+        for _ in range(count)
+    ]
+
+
+class Endpoints(Benchmark):
+    name = 'endpoints'
+    help = (
+        'Request the home page, poll page, vote, results page and the '
+        'polls APIs in process and report throughput, latency and queries '
+        'per request'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--polls', type=int, default=1000,
+            help='Benchmark polls to have in the database, 1000 to 10000000'
+        )
+        parser.add_argument('--choices', type=int, default=4)
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help='Requests per scenario'
+        )
+        parser.add_argument(
+            '--scenario', choices=sorted(SCENARIOS), action='append',
+            help='Defaults to every scenario'
+        )
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Keep the generated polls for the next run'
+        )
+
+    def run(self, polls, choices, requests, scenario=None, keep=False,
+            **options):
+        existing = benchmark_polls().count()
+        try:
+            generate_polls(polls - existing, choices=choices)
+            polls = max(polls, existing)
+            samples = sample_choices(min(requests, 100))
+            return [
+                self.measure(name, polls, requests, samples)
+                for name in scenario or sorted(SCENARIOS)
+            ]
+        finally:
+            if not keep:
+                delete_benchmark_polls()
+
+    def measure(self, name, polls, requests, samples):
+        send = SCENARIOS[name]
+        client = local_client()
+        bounds = Poll.objects.aggregate(low=Min('id'), high=Max('id'))
+        timings = []
+        queries = []
+        sizes = []
+        errors = 0
+
+        cpu_start = time.process_time()
+        with Timer() as total:
+            for i in range(requests):
+                uid, choice_id = samples[i % len(samples)]
+                cursor = random.randint(bounds['low'], bounds['high'])
+                with CaptureQueriesContext(connection) as captured:
+                    with Timer() as timer:
+                        response = send(client, uid, choice_id, cursor)
+                if response.status_code >= 400:
+                    errors += 1
+                    continue
+                timings.append(timer.elapsed)
+                queries.append(len(captured))
+                if not response.streaming:
+                    sizes.append(len(response.content))
+
+        cpu = time.process_time() - cpu_start
+        return {
+            'scenario': name,
+            'polls': polls,
+            'requests': requests,
+            'errors': errors,
+            'requests_per_second': round(len(timings) / total.elapsed, 1),
+            'p50_ms': round(percentile(timings, 50) * 1000, 2),
+            'p95_ms': round(percentile(timings, 95) * 1000, 2),
+            'p99_ms': round(percentile(timings, 99) * 1000, 2),
+            'queries_per_request': round(
+                sum(queries) / max(len(queries), 1), 2
+            ),
+            'max_queries': max(queries, default=0),
+            'cpu_ms': round(cpu * 1000 / max(len(timings), 1), 2),
+            'response_bytes': round(sum(sizes) / max(len(sizes), 1)),
+        }
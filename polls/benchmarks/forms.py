@@ -0,0 +1,79 @@
+from django import forms
+from django.template.loader import render_to_string
+from polls.benchmarks.base import Benchmark, Timer, percentile
+from polls.forms import NewPollForm
+
+CHOICE_ATTRS = {
+    'placeholder': 'Enter a choice here...',
+    'class': 'form-control'
+}
+
+
+class PerFieldForm(NewPollForm):
+    # builds a new field and widget for every choice, as NewPollForm used to
+    def __init__(self, *args, **kwargs):
+        forms.Form.__init__(self, *args, **kwargs)
+        if self.is_bound:
+            for name in self.data:
+                if name.startswith('choice_'):
+                    self.fields[name] = self.new_field(name.split('_')[1])
+        for i in range(len(self.fields), 6):
+            self.fields[f'choice_{i}'] = self.new_field(str(i))
+
+    def new_field(self, label):
+        return forms.CharField(
+            label=label,
+            max_length=200,
+            required=False,
+            widget=forms.TextInput(attrs=CHOICE_ATTRS)
+        )
+
+
+FORMS = {
+    'per_field': PerFieldForm,
+    'shared_widget': NewPollForm,
+}
+
+
+class Forms(Benchmark):
+    name = 'forms'
+    help = (
+        'Time building and rendering the new poll form for submissions '
+        'with more and more choices'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=100)
+        parser.add_argument(
+            '--choices', type=int, nargs='+', default=[6, 50, 500],
+            help='How many choices each submission has'
+        )
+
+    def run(self, renders, choices, **options):
+        return [
+            self.measure(name, renders, count)
+            for count in choices
+            for name in sorted(FORMS)
+        ]
+
+    def measure(self, name, renders, count):
+        form_class = FORMS[name]
+        data = {'text': 'Which one?'}
+        data.update((f'choice_{i}', f'Choice {i}') for i in range(count))
+        builds = []
+        renders_taken = []
+        for _ in range(renders):
+            with Timer() as build:
+                form = form_class(data=data)
+            with Timer() as render:
+                render_to_string('new_poll_fields.html', {'form': form})
+            builds.append(build.elapsed)
+            renders_taken.append(render.elapsed)
+        return {
+            'form': name,
+            'choices': count,
+            'renders': renders,
+            'build_p50_us': round(percentile(builds, 50) * 1e6, 1),
+            'render_p50_ms': round(percentile(renders_taken, 50) * 1000, 3),
+            'render_p95_ms': round(percentile(renders_taken, 95) * 1000, 3),
+        }
@@ -0,0 +1,149 @@
+import http.client
+import threading
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+from polls.benchmarks.base import Benchmark, Timer, percentile
+from polls.benchmarks.data import BENCHMARK_TEXT
+from polls.dedup import VOTER_COOKIE, new_voter_cookie
+from polls.models import Poll, Choice
+
+
+class Client:
+    # one keep-alive connection per simulated user
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https'
+            else http.client.HTTPConnection
+        )
+        self.connection = connection_class(parts.netloc, timeout=30)
+        self.csrf_token = None
+
+    def request(self, method, path, body=None, headers=None):
+        try:
+            self.connection.request(method, path, body, headers or {})
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return None
+        cookie = SimpleCookie(response.getheader('Set-Cookie', ''))
+        if 'csrftoken' in cookie:
+            self.csrf_token = cookie['csrftoken'].value
+        return response.status
+
+    def vote(self, poll, choice_id):
+        if self.csrf_token is None:
+            self.request('GET', f'/poll/{poll.uid}')
+        return self.request(
+            'POST',
+            f'/poll/{poll.uid}',
+            urlencode({'choice_id': choice_id}),
+            {
+                'Content-Type': 'application/x-www-form-urlencoded',
+                # a new voter every time, repeat votes are not counted
+                'Cookie': (
+                    f'csrftoken={self.csrf_token}; '
+                    f'{VOTER_COOKIE}={new_voter_cookie()}'
+                ),
+                'X-CSRFToken': self.csrf_token,
+            }
+        )
+
+
+TARGETS = {
+    'poll': lambda client, poll, choice_id: client.request(
+        'GET', f'/poll/{poll.uid}'
+    ),
+    'vote': lambda client, poll, choice_id: client.vote(poll, choice_id),
+    'results': lambda client, poll, choice_id: client.request(
+        'GET', f'/poll/{poll.uid}/results'
+    ),
+    'detail_api': lambda client, poll, choice_id: client.request(
+        'GET', f'/api/v1/poll/{poll.uid}'
+    ),
+}
+
+
+class HttpLoad(Benchmark):
+    name = 'http_load'
+    help = (
+        'Load a running server over HTTP, for example to compare the '
+        'gunicorn WSGI deployment with uvicorn serving votingsite.asgi'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://127.0.0.1:8000',
+            help=(
+                'Server to load, it must share the configured database and '
+                'SECRET_KEY'
+            )
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument(
+            '--target', choices=sorted(TARGETS), action='append',
+            help='Defaults to every target'
+        )
+
+    def run(self, base_url, requests, concurrency, target=None, **options):
+        poll = Poll.objects.create_unique(text=BENCHMARK_TEXT)
+        Choice.objects.bulk_create(
+            Choice(poll=poll, text=f'Choice {i}') for i in range(4)
+        )
+        choice_ids = list(
+            Choice.objects.filter(poll=poll).values_list('id', flat=True)
+        )
+        try:
+            return [
+                self.load(
+                    name, base_url, poll, choice_ids, requests, concurrency
+                )
+                for name in target or sorted(TARGETS)
+            ]
+        finally:
+            poll.delete()
+
+    def load(self, name, base_url, poll, choice_ids, requests, concurrency):
+        send = TARGETS[name]
+        latencies = []
+        errors = []
+
+        def user(count):
+            client = Client(base_url)
+            for i in range(count):
+                choice_id = choice_ids[i % len(choice_ids)]
+                with Timer() as timer:
+                    status = send(client, poll, choice_id)
+                if status is None or status >= 400:
+                    errors.append(status)
+                else:
+                    latencies.append(timer.elapsed)
+            client.connection.close()
+
+        threads = [
+            threading.Thread(
+                target=user,
+                args=(requests // concurrency + (i < requests % concurrency),)
+            )
+            for i in range(concurrency)
+        ]
+        with Timer() as total:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        return {
+            'target': name,
+            'base_url': base_url,
+            'requests': requests,
+            'concurrency': concurrency,
+            'errors': len(errors),
+            'requests_per_second': round(len(latencies) / total.elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        }
@@ -0,0 +1,83 @@
+from django.conf import settings
+from polls.benchmarks.base import Benchmark, Timer
+from django.db.models import Max
+from polls.benchmarks.data import BENCHMARK_TEXT, delete_polls
+from polls.models import Poll, Choice, short_urltoken
+from polls.serializers import PollSerializer
+
+
+def validate(items):
+    validated = []
+    for item in items:
+        serializer = PollSerializer(data=item)
+        serializer.is_valid(raise_exception=True)
+        validated.append(serializer.validated_data)
+    return validated
+
+
+def create_one_by_one(items, batch_size):
+    # the original PollSerializer.create, one INSERT per row
+    for data in validate(items):
+        poll = Poll.objects.create(text=data['text'])
+        for choice_data in data['choices']:
+            Choice.objects.create(poll=poll, **choice_data)
+
+
+def create_in_bulk(items, batch_size):
+    validated = validate(items)
+    for start in range(0, len(validated), batch_size):
+        PollSerializer(many=True).create(
+            validated[start:start + batch_size]
+        )
+
+
+STRATEGIES = {
+    'one-by-one': create_one_by_one,
+    'bulk': create_in_bulk,
+}
+
+
+class BulkImport(Benchmark):
+    name = 'bulk_import'
+    help = 'Import polls through the API serializers, one by one or in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--polls', type=int, default=100000)
+        parser.add_argument('--choices', type=int, default=4)
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.POLLS_BULK_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--strategy', choices=sorted(STRATEGIES), action='append',
+            help='Defaults to every strategy'
+        )
+
+    def run(self, polls, choices, batch_size, strategy=None, **options):
+        # the API picks the uids, so the imported polls are told apart by
+        # a token in their text that nobody else knows
+        text = f'{BENCHMARK_TEXT} {short_urltoken()}'
+        items = [
+            {
+                'text': f'{text} {i}',
+                'choices': [{'text': f'Choice {j}'} for j in range(choices)]
+            }
+            for i in range(polls)
+        ]
+        results = []
+        for name in strategy or sorted(STRATEGIES):
+            last_id = Poll.objects.aggregate(last=Max('id'))['last'] or 0
+            try:
+                with Timer() as timer:
+                    STRATEGIES[name](items, batch_size)
+            finally:
+                delete_polls(Poll.objects.filter(
+                    id__gt=last_id,
+                    text__startswith=f'{text} '
+                ))
+            results.append({
+                'strategy': name,
+                'polls': polls,
+                'seconds': round(timer.elapsed, 2),
+                'polls_per_second': round(polls / timer.elapsed, 1),
+            })
+        return results
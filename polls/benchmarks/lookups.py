@@ -0,0 +1,56 @@
+import random
+from django.db.models import Max, Min
+from polls.benchmarks.base import Benchmark, Timer, percentile
+from polls.benchmarks.data import generate_polls, delete_benchmark_polls
+from polls.models import Poll
+
+
+class UidLookup(Benchmark):
+    name = 'uid_lookup'
+    help = (
+        'Time Poll lookups by uid as the table grows, the way every poll '
+        'page and API route finds its poll'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+',
+            default=[10000, 100000, 1000000, 10000000],
+            help='Table sizes to measure at, in polls'
+        )
+        parser.add_argument('--lookups', type=int, default=1000)
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Keep the generated polls instead of deleting them'
+        )
+
+    def run(self, sizes, lookups, keep=False, **options):
+        results = []
+        try:
+            for size in sorted(sizes):
+                generate_polls(size - Poll.objects.count())
+                results.append(self.measure(size, lookups))
+        finally:
+            if not keep:
+                delete_benchmark_polls()
+        return results
+
+    def measure(self, size, lookups):
+        bounds = Poll.objects.aggregate(low=Min('id'), high=Max('id'))
+        uids = [
+            Poll.objects.filter(
+                id__gte=random.randint(bounds['low'], bounds['high'])
+            ).order_by('id').values_list('uid', flat=True)[0]
+            for _ in range(lookups)
+        ]
+        timings = []
+        for uid in uids:
+            with Timer() as timer:
+                Poll.objects.get(uid=uid)
+            timings.append(timer.elapsed)
+        return {
+            'polls': size,
+            'lookups': lookups,
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        }
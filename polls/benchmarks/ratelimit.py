@@ -0,0 +1,61 @@
+import secrets
+from django.conf import settings
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+from polls.benchmarks.base import Benchmark, Timer, percentile
+from polls.ratelimit import RateLimitMiddleware
+
+
+class RateLimit(Benchmark):
+    name = 'rate_limit'
+    help = (
+        'Time the rate limit check on its own, for clients that are let '
+        'through and clients that are turned away'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=10000)
+        parser.add_argument(
+            '--cache', default='default',
+            help='Cache alias to keep the token buckets in'
+        )
+
+    def run(self, checks, cache, **options):
+        rate_limits = dict(
+            settings.POLLS_RATE_LIMITS,
+            ENABLED=True,
+            CACHE=cache,
+            RULES={
+                'vote': {
+                    'VIEWS': ['poll'],
+                    'METHODS': ['POST'],
+                    'RATE': 0.001,
+                    'BURST': 1,
+                },
+            }
+        )
+        with override_settings(POLLS_RATE_LIMITS=rate_limits):
+            return [
+                self.measure('allowed', checks, new_client=True),
+                self.measure('rejected', checks, new_client=False),
+            ]
+
+    def measure(self, outcome, checks, new_client):
+        middleware = RateLimitMiddleware(lambda request: None)
+        request = RequestFactory().post('/poll/benchmark')
+        request.resolver_match = resolve('/poll/benchmark')
+        request.META['REMOTE_ADDR'] = secrets.token_hex(8)
+        timings = []
+        for _ in range(checks):
+            if new_client:
+                request.META['REMOTE_ADDR'] = secrets.token_hex(8)
+            with Timer() as timer:
+                middleware.process_view(request, None, (), {})
+            timings.append(timer.elapsed)
+        return {
+            'outcome': outcome,
+            'checks': checks,
+            'p50_us': round(percentile(timings, 50) * 1e6, 1),
+            'p99_us': round(percentile(timings, 99) * 1e6, 1),
+            'mean_us': round(sum(timings) / len(timings) * 1e6, 1),
+        }
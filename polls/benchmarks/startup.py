@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+from collections import Counter
+from django.conf import settings
+from polls.benchmarks.base import Benchmark
+
+# what each stage imports, in a fresh interpreter
+STAGES = {
+    'wsgi': 'import votingsite.wsgi',
+    'urls': (
+        'import votingsite.wsgi\n'
+        'from django.urls import get_resolver\n'
+        'get_resolver().url_patterns'
+    ),
+    'preload': (
+        'import votingsite.wsgi\n'
+        'from polls.preload import preload\n'
+        'preload()'
+    ),
+}
+
+
+def parse_importtime(output, depth=1):
+    # self time in microseconds per module, grouped by the first depth
+    # parts of the module name
+    times = Counter()
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        module = '.'.join(name.strip().split('.')[:depth])
+        times[module] += int(own)
+    return times
+
+
+class Startup(Benchmark):
+    name = 'startup'
+    help = (
+        'Profile what a worker imports while it starts with python -X '
+        'importtime, and report the import time per package'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stage', choices=sorted(STAGES), default='urls',
+            help=(
+                'wsgi loads the application, urls also the URLconf as the '
+                'first request does, preload what gunicorn preloads'
+            )
+        )
+        parser.add_argument(
+            '--depth', type=int, default=1,
+            help='Group modules by this many parts of their name'
+        )
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Keep the fastest of this many runs of each package'
+        )
+
+    def run(self, stage, depth, top, repeat, **options):
+        fastest = None
+        for _ in range(repeat):
+            times = parse_importtime(self.profile(stage), depth)
+            if fastest is None:
+                fastest = times
+            else:
+                fastest = Counter({
+                    module: min(fastest[module], times[module])
+                    for module in fastest.keys() & times.keys()
+                })
+        results = [{
+            'stage': stage,
+            'module': 'total',
+            'import_ms': round(sum(fastest.values()) / 1000, 1),
+        }]
+        results.extend(
+            {
+                'stage': stage,
+                'module': module,
+                'import_ms': round(microseconds / 1000, 1),
+            }
+            for module, microseconds in fastest.most_common(top)
+        )
+        return results
+
+    def profile(self, stage):
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STAGES[stage]],
+            env=dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE=os.environ.get(
+                    'DJANGO_SETTINGS_MODULE', 'votingsite.settings'
+                )
+            ),
+            cwd=settings.BASE_DIR,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True
+        )
+        return process.stderr
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from polls.benchmarks.base import Benchmark, percentile
+from polls.benchmarks.data import BENCHMARK_TEXT
+from polls.benchmarks.endpoints import local_client
+from polls.models import Poll, Choice
+
+PAGES = {
+    'home': lambda uid: reverse('home'),
+    'poll': lambda uid: reverse('poll', kwargs={'uid': uid}),
+    'results': lambda uid: reverse('results', kwargs={'uid': uid}),
+}
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# the loaders and fragment cache timeout each mode renders with
+MODES = {
+    'uncached': (LOADERS, 0),
+    'cached_loader': (
+        [('django.template.loaders.cached.Loader', LOADERS)], 0
+    ),
+    'fragments': (
+        [('django.template.loaders.cached.Loader', LOADERS)],
+        settings.POLLS_POLL_CACHE['FRAGMENT_TIMEOUT']
+    ),
+}
+
+
+class Templates(Benchmark):
+    name = 'templates'
+    help = (
+        'Time rendering the home, poll and results pages with the plain '
+        'and the cached template loader, and with fragment caching'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=300)
+        parser.add_argument('--choices', type=int, default=4)
+
+    def run(self, renders, choices, **options):
+        poll = Poll.objects.create_unique(text=BENCHMARK_TEXT)
+        Choice.objects.bulk_create(
+            Choice(poll=poll, text=f'Choice {i}', votes=i)
+            for i in range(choices)
+        )
+        try:
+            return [
+                self.measure(page, mode, renders, poll.uid)
+                for page in sorted(PAGES)
+                for mode in MODES
+            ]
+        finally:
+            poll.delete()
+
+    def measure(self, page, mode, renders, uid):
+        loaders, fragment_timeout = MODES[mode]
+        templates = [dict(settings.TEMPLATES[0], OPTIONS=dict(
+            settings.TEMPLATES[0]['OPTIONS'], loaders=loaders
+        ))]
+        poll_cache = dict(
+            settings.POLLS_POLL_CACHE, FRAGMENT_TIMEOUT=fragment_timeout
+        )
+        url = PAGES[page](uid)
+        client = local_client()
+        timings = []
+        cache.clear()
+        with override_settings(
+            TEMPLATES=templates, POLLS_POLL_CACHE=poll_cache
+        ):
+            for _ in range(renders):
+                response = client.get(url)
+                timings.append(response.timings.seconds['template'])
+        return {
+            'page': page,
+            'mode': mode,
+            'renders': renders,
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 95) * 1000, 3),
+            'mean_ms': round(sum(timings) * 1000 / renders, 3),
+        }
@@ -0,0 +1,109 @@
+import threading
+from django.db import connection, OperationalError
+from polls.benchmarks.base import Benchmark, Timer, percentile
+from polls.models import Poll, Choice
+from polls.buffer import shutdown
+from polls.votes import record_vote, record_buffered_vote
+
+
+def read_modify_write_vote(uid, choice_id):
+    # the original PollView.post implementation, kept for comparison
+    Poll.objects.get(uid=uid)
+    choice = Choice.objects.get(id=choice_id)
+    choice.votes += 1
+    choice.save()
+
+
+STRATEGIES = {
+    'atomic': record_vote,
+    'buffered': record_buffered_vote,
+    'read-modify-write': read_modify_write_vote,
+}
+
+
+class ConcurrentVotes(Benchmark):
+    name = 'concurrent_votes'
+    help = (
+        'Vote concurrently on a single poll and count how many votes '
+        'were lost by each vote strategy'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--voters', type=int, default=300,
+            help='Number of voters per choice'
+        )
+        parser.add_argument('--choices', type=int, default=2)
+        parser.add_argument(
+            '--concurrency', type=int, default=100,
+            help='Voter threads, each holds its own database connection'
+        )
+        parser.add_argument(
+            '--strategy', choices=sorted(STRATEGIES), action='append',
+            help='Defaults to every strategy'
+        )
+
+    def run(self, voters, choices, concurrency, strategy=None, **options):
+        return [
+            self.run_strategy(name, voters, choices, concurrency)
+            for name in strategy or sorted(STRATEGIES)
+        ]
+
+    def run_strategy(self, name, voters, choices, concurrency):
+        vote = STRATEGIES[name]
+        poll = Poll.objects.create(text=f'Benchmark poll ({name})')
+        poll_choices = [
+            Choice.objects.create(text=str(i), poll=poll)
+            for i in range(choices)
+        ]
+        ballots = [c.id for c in poll_choices for _ in range(voters)]
+        concurrency = min(concurrency, len(ballots))
+        barrier = threading.Barrier(concurrency)
+        latencies = []
+
+        def voter(choice_ids):
+            # line every thread up first so their votes collide
+            barrier.wait()
+            try:
+                for choice_id in choice_ids:
+                    with Timer() as timer:
+                        try:
+                            vote(poll.uid, choice_id)
+                        except OperationalError:
+                            latencies.append(None)
+                            continue
+                    latencies.append(timer.elapsed)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=voter, args=(ballots[i::concurrency],))
+            for i in range(concurrency)
+        ]
+        try:
+            with Timer() as total:
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                # buffered votes only count once they are flushed
+                shutdown()
+            recorded = sum(
+                Choice.objects.filter(poll=poll).values_list(
+                    'votes', flat=True
+                )
+            )
+        finally:
+            poll.delete()
+
+        timings = [t for t in latencies if t is not None]
+        return {
+            'strategy': name,
+            'expected_votes': len(ballots),
+            'recorded_votes': recorded,
+            'lost_votes': len(timings) - recorded,
+            'errors': len(latencies) - len(timings),
+            'votes_per_second': round(len(timings) / total.elapsed, 1),
+            'p50_ms': round(percentile(timings, 50) * 1000, 2),
+            'p99_ms': round(percentile(timings, 99) * 1000, 2),
+        }
@@ -0,0 +1,204 @@
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+from django.conf import settings
+from django.db import close_old_connections, connection
+from polls.models import Choice
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = '.journal'
+
+
+def lock_file(journal):
+    import fcntl
+    try:
+        fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def read_journal(journal):
+    counts = Counter()
+    for line in journal:
+        choice_id, votes = line.split()
+        counts[int(choice_id)] += int(votes)
+    return counts
+
+
+class Journal:
+    # append only log of buffered votes, locked for as long as this
+    # process owns it so drain_journals can tell live journals apart
+    # from the ones left behind by a crashed worker
+
+    def __init__(self, directory, fsync):
+        self.directory = directory
+        self.fsync = fsync
+        self.generation = 0
+        self.open()
+
+    def open(self):
+        self.generation += 1
+        name = f'votes-{os.getpid()}-{self.generation}{JOURNAL_SUFFIX}'
+        self.path = os.path.join(self.directory, name)
+        # lock before the file is visible under its journal name
+        self.file = open(self.path + '.new', 'a')
+        lock_file(self.file)
+        os.rename(self.path + '.new', self.path)
+
+    def write(self, counts):
+        self.file.writelines(
+            f'{choice_id} {votes}\n' for choice_id, votes in counts.items()
+        )
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def rotate(self):
+        old_file, old_path = self.file, self.path
+        self.open()
+        return old_file, old_path
+
+    def close(self):
+        self.file.close()
+        os.remove(self.path)
+
+
+class VoteBuffer:
+
+    def __init__(self, flush_interval=0.25, max_pending=1000,
+                 journal_dir=None, fsync=False):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = Counter()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.journal = journal_dir and Journal(journal_dir, fsync)
+
+    def add(self, choice_id):
+        with self.lock:
+            self.pending[choice_id] += 1
+            self.size += 1
+            if self.journal:
+                self.journal.write({choice_id: 1})
+            full = self.size >= self.max_pending
+        if not full:
+            self.start()
+            return
+        try:
+            self.flush()
+        except Exception:
+            pass  # already logged, the votes stay buffered
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                counts, self.pending, self.size = self.pending, Counter(), 0
+                rotated = self.journal and self.journal.rotate()
+            try:
+                if counts:
+                    Choice.objects.add_votes(counts)
+            except Exception:
+                logger.exception(
+                    'Failed to flush %d votes', sum(counts.values())
+                )
+                # keep the votes for the next flush
+                with self.lock:
+                    self.pending.update(counts)
+                    self.size += sum(counts.values())
+                    if self.journal:
+                        self.journal.write(counts)
+                raise
+            finally:
+                if rotated:
+                    rotated[0].close()
+                    os.remove(rotated[1])
+        return sum(counts.values())
+
+    def start(self):
+        if self.thread or not self.flush_interval:
+            return
+        with self.lock:
+            if self.thread:
+                return
+            self.thread = threading.Thread(
+                target=self.run,
+                name='vote-buffer-flusher',
+                daemon=True
+            )
+            self.thread.start()
+        atexit.register(self.stop)
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.flush_interval):
+                # no request cycle closes this thread's connection, so drop
+                # it here once it is too old or broken
+                close_old_connections()
+                try:
+                    self.flush()
+                except Exception:
+                    pass  # already logged, the votes stay buffered
+                finally:
+                    close_old_connections()
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        self.flush()
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+
+def drain_journals(directory):
+    # replay journals whose worker is gone, live ones are still locked
+    drained = 0
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(JOURNAL_SUFFIX):
+            continue
+        path = os.path.join(directory, name)
+        with open(path) as journal:
+            if not lock_file(journal):
+                continue
+            counts = read_journal(journal)
+            if counts:
+                Choice.objects.add_votes(counts)
+            os.remove(path)
+        drained += sum(counts.values())
+    return drained
+
+
+_buffer = None
+_buffer_pid = None
+
+
+def get_vote_buffer():
+    global _buffer, _buffer_pid
+    # a buffer inherited from a preloading parent process is not ours
+    if _buffer is None or _buffer_pid != os.getpid():
+        options = settings.POLLS_VOTE_BUFFER
+        _buffer = VoteBuffer(
+            flush_interval=options['FLUSH_INTERVAL'],
+            max_pending=options['MAX_PENDING'],
+            journal_dir=options['JOURNAL_DIR'],
+            fsync=options['FSYNC'],
+        )
+        _buffer_pid = os.getpid()
+    return _buffer
+
+
+def shutdown():
+    global _buffer
+    if _buffer is not None and _buffer_pid == os.getpid():
+        _buffer.stop()
+    _buffer = None
@@ -0,0 +1,83 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from polls.models import ArchivedPoll, Poll, Choice
+
+
+def vote_stamp(votes):
+    # votes are (choice id, vote count) pairs
+    counts = ','.join(f'{choice}:{count}' for choice, count in sorted(votes))
+    return hashlib.md5(counts.encode()).hexdigest()[:16]
+
+
+def cache_archived_data(uid):
+    # archived polls are packed with their final vote counts
+    from polls.serializers import ArchivedPollSerializer
+    archived = ArchivedPoll.objects.get(uid=uid)
+    data = json.loads(json.dumps(ArchivedPollSerializer(archived).data))
+    data['archived'] = True
+    cache.set(
+        f'polls:poll:{uid}', data, settings.POLLS_POLL_CACHE['TIMEOUT']
+    )
+    return data
+
+
+def get_poll_data(uid):
+    # a poll's text and choices never change after it is created, so the
+    # serialized poll is cached as is and only the vote counts are fresh
+    key = f'polls:poll:{uid}'
+    data = cache.get(key)
+    if data is None:
+        # rest_framework is only imported on the first miss
+        from polls.serializers import PollSerializer
+        try:
+            poll = Poll.objects.with_choices().get(uid=uid)
+        except Poll.DoesNotExist:
+            return cache_archived_data(uid)
+        data = json.loads(json.dumps(PollSerializer(poll).data))
+        options = settings.POLLS_POLL_CACHE
+        cache.set(key, data, options['TIMEOUT'])
+        cache.set(f'polls:live:{uid}', True, options['MAX_AGE'])
+    return data
+
+
+def get_live_poll_data(uid):
+    # polls are archived by another process, which cannot clear this one's
+    # cache, so a cached poll is checked to still be live once every
+    # MAX_AGE seconds, as long as browsers may keep the page anyway
+    data = get_poll_data(uid)
+    if data.get('archived') or cache.get(f'polls:live:{uid}'):
+        return data
+    if Poll.objects.filter(uid=uid).exists():
+        cache.set(
+            f'polls:live:{uid}', True, settings.POLLS_POLL_CACHE['MAX_AGE']
+        )
+        return data
+    return cache_archived_data(uid)
+
+
+def get_ranked_choices(poll):
+    # the counts only change along with the poll's version, except for
+    # votes waiting in shards which it does not count until compaction
+    def ranked():
+        return list(
+            poll.choices.with_votes().order_by('-current_votes', 'id')
+        )
+
+    if settings.POLLS_VOTE_SHARDS:
+        return ranked()
+    key = f'polls:results:{poll.uid}:{poll.version}'
+    choices = cache.get(key)
+    if choices is None:
+        choices = ranked()
+        cache.set(key, choices, settings.POLLS_RESULTS_CHART['TIMEOUT'])
+    return choices
+
+
+def get_votes(poll_id):
+    return dict(
+        Choice.objects.with_votes().filter(poll_id=poll_id).values_list(
+            'id', 'current_votes'
+        )
+    )
@@ -0,0 +1,77 @@
+import functools
+import time
+from django.conf import settings
+from django.core.cache import cache
+from polls.cache import vote_stamp
+from polls.svg import render_pie
+from polls.timing import timed
+
+colors = (
+    '#f75f5f', '#4fef44', '#44efe5',
+    '#c844ef', '#ef4488', '#e8f562',
+    '#f5b762', '#6286f5'
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_custom_style():
+    # pygal is only imported when charts are rendered with it
+    from pygal.style import Style
+    return Style(
+        background='transparent',
+        plot_background='#2b2b2b',
+        foreground='white',
+        foreground_strong='white',
+        foreground_subtle='white',
+        transition='100ms ease-in',
+        opacity_hover='.25',
+        tooltip_font_size=22,
+        colors=colors
+    )
+
+
+def choice_color(index):
+    return colors[index % len(colors)]
+
+
+def render_pygal(choices):
+    from pygal import Pie
+    pie_chart = Pie(style=get_custom_style())
+    for choice in choices:
+        pie_chart.add(choice.text, choice.current_votes)
+    return pie_chart.render()
+
+
+def render_svg(choices):
+    return render_pie([
+        (choice.text, choice.current_votes, choice_color(i))
+        for i, choice in enumerate(choices)
+    ])
+
+
+RENDERERS = {'pygal': render_pygal, 'svg': render_svg}
+
+
+def render_chart(choices):
+    render = RENDERERS[settings.POLLS_RESULTS_CHART['RENDERER']]
+    with timed('chart'):
+        return render(choices)
+
+
+def get_chart(uid, choices):
+    # returns the stamp and svg of the chart to serve, an older chart is
+    # reused for STALE_SECONDS so hot polls are not re-rendered every vote
+    options = settings.POLLS_RESULTS_CHART
+    stamp = vote_stamp((c.id, c.current_votes) for c in choices)
+    key = f'polls:chart:{uid}'
+    cached = cache.get(key)
+    if cached:
+        cached_stamp, svg, rendered_at = cached
+        if cached_stamp == stamp or (
+            time.time() - rendered_at < options['STALE_SECONDS']
+        ):
+            return cached_stamp, svg
+
+    svg = render_chart(choices)
+    cache.set(key, (stamp, svg, time.time()), options['TIMEOUT'])
+    return stamp, svg
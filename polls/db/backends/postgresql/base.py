@@ -0,0 +1,55 @@
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+from polls.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+def check(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+
+def reset(connection):
+    if connection.closed:
+        raise base.Database.InterfaceError('Connection already closed')
+    status = connection.get_transaction_status()
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # takes connections from a pool shared by the threads of the process
+    # and closing one puts it back, with CONN_MAX_AGE 0 that happens at the
+    # end of every request. Configure it with a POOL dict next to ENGINE.
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get('POOL', {})
+        return get_pool(self.alias, lambda: ConnectionPool(
+            check,
+            reset,
+            max_size=options.get('MAX_SIZE', 10),
+            timeout=options.get('TIMEOUT', 10),
+            check_after=options.get('CHECK_AFTER', 30),
+        ))
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        try:
+            connection = self.pool.get(lambda: connect(conn_params))
+        except PoolTimeout as error:
+            raise base.Database.OperationalError(str(error)) from error
+        # only set by the parent when it opens a connection, not when the
+        # pool hands out an open one
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', extensions.ISOLATION_LEVEL_READ_COMMITTED
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.put(self.connection)
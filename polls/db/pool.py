@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    # at most max_size connections per process, shared by its threads.
+    # Connections idle for longer than check_after seconds are checked
+    # before they are handed out again, so a connection the server dropped
+    # is replaced instead of failing the request that gets it.
+
+    def __init__(self, check, reset, max_size=10, timeout=10,
+                 check_after=30):
+        self.check = check
+        self.reset = reset
+        self.timeout = timeout
+        self.check_after = check_after
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.idle = []
+        self.opened = 0
+
+    def get(self, connect):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f'No pooled connection free after {self.timeout} seconds'
+            )
+        try:
+            while True:
+                with self.lock:
+                    if not self.idle:
+                        break
+                    # most recently used first, so extra connections from
+                    # a burst go idle and stop being used
+                    connection, returned = self.idle.pop()
+                idle_for = time.monotonic() - returned
+                if idle_for < self.check_after or self.check(connection):
+                    return connection
+                self.discard(connection)
+            connection = connect()
+            self.opened += 1
+            return connection
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def put(self, connection):
+        try:
+            self.reset(connection)
+        except Exception:
+            self.discard(connection)
+        else:
+            with self.lock:
+                self.idle.append((connection, time.monotonic()))
+        finally:
+            self.slots.release()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, _ in idle:
+            self.discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, create):
+    # keyed by process as well, a forked worker must never reuse the
+    # connections of its parent
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = create()
+        return _pools[key]
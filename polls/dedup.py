@@ -0,0 +1,185 @@
+import hashlib
+import hmac
+import math
+import secrets
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.signing import get_cookie_signer
+from django.db import transaction, IntegrityError
+from polls.models import VoteFingerprint
+from polls.ratelimit import client_address
+from polls.votes import record_vote
+
+VOTER_COOKIE = 'voter'
+
+
+class DuplicateVote(Exception):
+    pass
+
+
+class BloomFilter:
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        ))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    def positions(self, key):
+        # double hashing, every position comes from the same two hashes
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return (
+            (first + i * second) % self.size for i in range(self.hashes)
+        )
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(key)
+        )
+
+
+class VoteFilters:
+    # one filter per poll for the most recently voted on polls, so memory
+    # stays bounded however many polls there are
+
+    def __init__(self, capacity, error_rate, max_polls):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_polls = max_polls
+        self.filters = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, uid):
+        with self.lock:
+            seen = self.filters.get(uid)
+            if seen is None:
+                seen = BloomFilter(self.capacity, self.error_rate)
+                self.filters[uid] = seen
+                if len(self.filters) > self.max_polls:
+                    self.filters.popitem(last=False)
+            else:
+                self.filters.move_to_end(uid)
+            return seen
+
+
+_filters = None
+
+
+def get_vote_filters():
+    global _filters
+    if _filters is None:
+        options = settings.POLLS_VOTE_DEDUP
+        _filters = VoteFilters(
+            options['CAPACITY'],
+            options['FALSE_POSITIVE_RATE'],
+            options['MAX_POLLS'],
+        )
+    return _filters
+
+
+def reset_vote_filters():
+    global _filters
+    _filters = None
+
+
+def get_voter(request):
+    # the cookie is signed, so a made up voter counts as no cookie at all
+    return request.get_signed_cookie(VOTER_COOKIE, default=None)
+
+
+def new_voter_cookie():
+    # the value set_signed_cookie sends for a new voter
+    return get_cookie_signer(salt=VOTER_COOKIE).sign(
+        secrets.token_urlsafe(16)
+    )
+
+
+def make_fingerprint(uid, key):
+    return hmac.new(
+        settings.SECRET_KEY.encode(),
+        f'{uid}:{key}'.encode(),
+        hashlib.sha256
+    ).hexdigest()[:32]
+
+
+def voter_fingerprint(request, uid):
+    # browsers are told apart by their voter cookie, clients that do not
+    # keep cookies by their address
+    voter = get_voter(request) or client_address(request)
+    return make_fingerprint(uid, voter)
+
+
+def address_fingerprints(request, uid):
+    # every vote also takes one of VOTES_PER_ADDRESS slots of its address,
+    # so people behind one NAT can all vote but a script that gets a new
+    # cookie for every vote cannot vote forever
+    address = client_address(request)
+    return [
+        make_fingerprint(uid, f'address:{address}:{slot}')
+        for slot in range(settings.POLLS_VOTE_DEDUP['VOTES_PER_ADDRESS'])
+    ]
+
+
+def is_recorded(uid, fingerprint, seen):
+    return fingerprint in seen and VoteFingerprint.objects.filter(
+        poll_id=uid,
+        fingerprint=fingerprint
+    ).exists()
+
+
+def free_slot(uid, slots, seen):
+    # slots missing from the filter are free unless another worker took
+    # them, only a full filter needs the exact check
+    free = [slot for slot in slots if slot not in seen]
+    if not free:
+        taken = set(VoteFingerprint.objects.filter(
+            poll_id=uid,
+            fingerprint__in=slots
+        ).values_list('fingerprint', flat=True))
+        free = [slot for slot in slots if slot not in taken]
+    return free[0] if free else None
+
+
+def record_unique_vote(uid, choice_id, fingerprint, address_slots=None):
+    # a filter miss means a new voter, only a hit needs the exact check
+    seen = get_vote_filters().get(uid)
+    if is_recorded(uid, fingerprint, seen):
+        raise DuplicateVote(f'Already voted on poll {uid}')
+
+    while True:
+        slot = None
+        if address_slots is not None:
+            slot = free_slot(uid, address_slots, seen)
+            if slot is None:
+                raise DuplicateVote(f'Too many votes on poll {uid}')
+        try:
+            with transaction.atomic():
+                VoteFingerprint.objects.bulk_create([
+                    VoteFingerprint(poll_id=uid, fingerprint=taken)
+                    for taken in (fingerprint, slot) if taken
+                ])
+                record_vote(uid, choice_id)
+        except IntegrityError:
+            if slot is None or VoteFingerprint.objects.filter(
+                poll_id=uid,
+                fingerprint=fingerprint
+            ).exists():
+                # voted before this process started filtering the poll
+                seen.add(fingerprint)
+                raise DuplicateVote(f'Already voted on poll {uid}')
+            # another worker took the slot first, try the next one
+            seen.add(slot)
+            continue
+        seen.add(fingerprint)
+        if slot:
+            seen.add(slot)
+        return
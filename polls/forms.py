@@ -1,3 +1,5 @@
+import copy
+from types import MappingProxyType
 from django import forms
 from django.core.exceptions import ValidationError
 from polls.models import Poll, Choice
@@ -5,6 +7,27 @@ from polls.models import Poll, Choice
 MISSING_TEXT_ERROR = 'Poll needs to have text'
 TWO_CHOICES_ERROR = 'Required to have at least two choices'
 
+CHOICE_FIELD = forms.CharField(
+    max_length=200,
+    required=False,
+    widget=forms.TextInput(attrs={
+        'placeholder': 'Enter a choice here...',
+        'class': 'form-control'
+    })
+)
+# every choice field of every form shares these, so they are read only
+CHOICE_FIELD.widget.attrs = MappingProxyType(CHOICE_FIELD.widget.attrs)
+CHOICE_FIELD.error_messages = MappingProxyType(CHOICE_FIELD.error_messages)
+CHOICE_FIELD.validators = tuple(CHOICE_FIELD.validators)
+
+
+def choice_field(label):
+    # choice fields only differ by label, a shallow copy shares the
+    # widget and validators instead of building new ones for every choice
+    field = copy.copy(CHOICE_FIELD)
+    field.label = label
+    return field
+
 
 class NewPollForm(forms.Form):
     text = forms.CharField(
@@ -20,32 +43,14 @@ class NewPollForm(forms.Form):
     def __init__(self, *args, **kwargs):
         super(NewPollForm, self).__init__(*args, **kwargs)
 
-        choice_attrs = {
-            'placeholder': 'Enter a choice here...',
-            'class': 'form-control'
-        }
-
         if self.is_bound:
-            choices = {
-                k: v for k, v in self.data.items()
-                if k.startswith('choice_')
-            }
-            for k, v in choices.items():
-                self.fields[k] = forms.CharField(
-                    label=k.split('_')[1],
-                    max_length=200,
-                    required=False,
-                    widget=forms.TextInput(attrs=choice_attrs)
-                )
+            for name in self.data:
+                if name.startswith('choice_'):
+                    self.fields[name] = choice_field(name.split('_')[1])
         # we want the page to have at least 5 choices to start
         # even if the user submitted an invalid form
         for i in range(len(self.fields), 6):
-            self.fields[f'choice_{i}'] = forms.CharField(
-                label=str(i),
-                max_length=200,
-                required=False,
-                widget=forms.TextInput(attrs=choice_attrs)
-            )
+            self.fields[f'choice_{i}'] = choice_field(str(i))
 
     def clean(self):
         super().clean()
@@ -65,6 +70,8 @@ class NewPollForm(forms.Form):
 
     def save(self):
         new_text = self.cleaned_data['text']
-        self.poll = Poll.objects.create(text=new_text)
-        for choice in self.cleaned_data['choices']:
-            Choice.objects.create(text=choice, poll=self.poll)
+        self.poll = Poll.objects.create_unique(text=new_text)
+        Choice.objects.bulk_create([
+            Choice(text=choice, poll=self.poll)
+            for choice in self.cleaned_data['choices']
+        ])
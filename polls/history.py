@@ -0,0 +1,87 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from polls.models import VoteCount, bucket_start
+
+RESOLUTIONS = {
+    'minute': VoteCount.MINUTE,
+    'hour': VoteCount.HOUR,
+    'day': VoteCount.DAY,
+}
+
+
+def roll_up(resolution, into, before, batch_size=1000):
+    # moves rows older than before into the coarser resolution a batch at
+    # a time, so the rows a vote is writing to are never locked for long
+    rolled = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                VoteCount.objects.select_for_update().filter(
+                    resolution=resolution,
+                    start__lt=before
+                ).order_by('start', 'id').values_list(
+                    'id', 'poll_id', 'choice_id', 'start', 'votes'
+                )[:batch_size]
+            )
+            if not rows:
+                return rolled
+            buckets = defaultdict(Counter)
+            for _, uid, choice_id, start, votes in rows:
+                buckets[bucket_start(start, into)][uid, choice_id] += votes
+            for start, counts in buckets.items():
+                VoteCount.objects.add_votes(counts, into, start)
+            VoteCount.objects.filter(id__in=[row[0] for row in rows]).delete()
+        rolled += len(rows)
+
+
+def roll_up_history(now=None, batch_size=1000):
+    options = settings.POLLS_VOTE_HISTORY
+    now = now or timezone.now()
+    # only whole hours and days are rolled up, a partly rolled up bucket
+    # would be counted at both resolutions until it is finished
+    rolled = roll_up(
+        VoteCount.MINUTE,
+        VoteCount.HOUR,
+        bucket_start(
+            now - timedelta(seconds=options['MINUTE_RETENTION']),
+            VoteCount.HOUR
+        ),
+        batch_size
+    )
+    rolled += roll_up(
+        VoteCount.HOUR,
+        VoteCount.DAY,
+        bucket_start(
+            now - timedelta(seconds=options['HOUR_RETENTION']),
+            VoteCount.DAY
+        ),
+        batch_size
+    )
+    expired = 0
+    if options['DAY_RETENTION'] is not None:
+        expired, _ = VoteCount.objects.filter(
+            resolution=VoteCount.DAY,
+            start__lt=now - timedelta(seconds=options['DAY_RETENTION'])
+        ).delete()
+    return rolled, expired
+
+
+def get_history(uid, resolution, since, until):
+    # finer rows are summed into the requested resolution, rows already
+    # rolled up past it are left out rather than smeared over its buckets
+    rows = VoteCount.objects.filter(
+        poll_id=uid,
+        start__gte=bucket_start(since, resolution),
+        start__lt=until,
+        resolution__lte=resolution
+    ).values_list('start', 'choice_id', 'votes')
+    series = defaultdict(Counter)
+    for start, choice_id, votes in rows:
+        series[bucket_start(start, resolution)][choice_id] += votes
+    return [
+        {'start': start, 'votes': dict(votes)}
+        for start, votes in sorted(series.items())
+    ]
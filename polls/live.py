@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+import re
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from polls.cache import get_votes, vote_stamp
+from polls.models import Poll
+
+logger = logging.getLogger(__name__)
+
+LIVE_PATH = re.compile(r'^/poll/(?P<uid>[^/]+)/results/live$')
+
+
+def live_results_url(uid):
+    return reverse('results', kwargs={'uid': uid}) + '/live'
+
+
+def coalesce(pending, message):
+    # vote counts are absolute, so a later count simply replaces an
+    # earlier one the subscriber has not read yet
+    if pending is None:
+        return message
+    return dict(message, votes={**pending['votes'], **message['votes']})
+
+
+class Subscription:
+
+    def __init__(self):
+        self.pending = None
+        self.closed = False
+        self.ready = asyncio.Event()
+
+    def put(self, message):
+        self.pending = coalesce(self.pending, message)
+        self.ready.set()
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+    async def get(self, timeout=None):
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.ready.clear()
+        message, self.pending = self.pending, None
+        return message
+
+
+class Broker:
+    # fans messages for a poll out to its subscribers, implement this
+    # interface to deliver them through something other than memory
+
+    def subscribe(self, uid):
+        raise NotImplementedError
+
+    def unsubscribe(self, uid, subscription):
+        raise NotImplementedError
+
+    def publish(self, uid, message):
+        raise NotImplementedError
+
+    def subscribers(self, uid):
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+
+    def __init__(self):
+        self.subscriptions = {}
+
+    def subscribe(self, uid):
+        subscription = Subscription()
+        self.subscriptions.setdefault(uid, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, uid, subscription):
+        subscriptions = self.subscriptions.get(uid, set())
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            self.subscriptions.pop(uid, None)
+
+    def publish(self, uid, message):
+        for subscription in self.subscriptions.get(uid, ()):
+            subscription.put(message)
+
+    def subscribers(self, uid):
+        return len(self.subscriptions.get(uid, ()))
+
+
+def get_poll_id(uid):
+    return Poll.objects.filter(uid=uid).values_list('id', flat=True).first()
+
+
+def results_message(uid, votes, changed):
+    chart_url = reverse('results_chart', kwargs={'uid': uid})
+    return {
+        'votes': changed,
+        'total': sum(votes.values()),
+        'chart': f'{chart_url}?v={vote_stamp(votes.items())}',
+    }
+
+
+class LiveResults:
+    # one ticker per watched poll reads the counts once per tick and
+    # publishes the ones that changed, however many people are watching
+
+    def __init__(self, broker, tick):
+        self.broker = broker
+        self.tick_seconds = tick
+        self.tickers = {}
+        self.latest = {}
+
+    async def subscribe(self, uid):
+        poll_id = await sync_to_async(get_poll_id)(uid)
+        if poll_id is None:
+            return None
+        subscription = self.broker.subscribe(uid)
+        if uid in self.latest:
+            subscription.put(self.latest[uid])
+
+        ticker = self.tickers.get(uid)
+        if ticker is None or ticker.done() or (
+            ticker.get_loop() is not asyncio.get_running_loop()
+        ):
+            self.latest.pop(uid, None)
+            self.tickers[uid] = asyncio.ensure_future(self.run(uid, poll_id))
+        return subscription
+
+    def unsubscribe(self, uid, subscription):
+        self.broker.unsubscribe(uid, subscription)
+
+    async def run(self, uid, poll_id):
+        try:
+            while self.broker.subscribers(uid):
+                try:
+                    await self.tick(uid, poll_id)
+                except Exception:
+                    # a database hiccup skips a tick, watchers get the
+                    # counts on the next one that works
+                    logger.exception('Failed to read results of %s', uid)
+                await asyncio.sleep(self.tick_seconds)
+        finally:
+            self.tickers.pop(uid, None)
+            self.latest.pop(uid, None)
+
+    async def tick(self, uid, poll_id):
+        votes = await sync_to_async(get_votes)(poll_id)
+        votes = {str(choice): count for choice, count in votes.items()}
+        previous = self.latest.get(uid, {'votes': {}})['votes']
+        changed = {
+            choice: count for choice, count in votes.items()
+            if previous.get(choice) != count
+        }
+        self.latest[uid] = results_message(uid, votes, votes)
+        if changed:
+            self.broker.publish(uid, results_message(uid, votes, changed))
+
+
+_live_results = None
+
+
+def get_live_results():
+    global _live_results
+    if _live_results is None:
+        options = settings.POLLS_LIVE_RESULTS
+        _live_results = LiveResults(
+            import_string(options['BROKER'])(),
+            options['TICK'],
+        )
+    return _live_results
+
+
+def reset_live_results():
+    global _live_results
+    _live_results = None
+
+
+async def stream_results(uid, receive, send):
+    live_results = get_live_results()
+    subscription = await live_results.subscribe(uid)
+    if subscription is None:
+        await send({
+            'type': 'http.response.start',
+            'status': 404,
+            'headers': [(b'content-type', b'text/plain')],
+        })
+        await send({'type': 'http.response.body', 'body': b'Not Found'})
+        return
+
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        subscription.close()
+
+    disconnect = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        keepalive = settings.POLLS_LIVE_RESULTS['KEEPALIVE']
+        while not subscription.closed:
+            message = await subscription.get(keepalive)
+            if subscription.closed:
+                break
+            if message is None:
+                event = ': keepalive\n\n'
+            else:
+                event = f'event: results\ndata: {json.dumps(message)}\n\n'
+            await send({
+                'type': 'http.response.body',
+                'body': event.encode(),
+                'more_body': True,
+            })
+    finally:
+        disconnect.cancel()
+        live_results.unsubscribe(uid, subscription)
+
+
+class LiveResultsMiddleware:
+    # ASGI middleware answering the live results event streams itself,
+    # Django 3.2 can not stream a response from an async view
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        match = scope['type'] == 'http' and LIVE_PATH.match(scope['path'])
+        if match and scope['method'] == 'GET':
+            await stream_results(match['uid'], receive, send)
+            return
+        await self.app(scope, receive, send)
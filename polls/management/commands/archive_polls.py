@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from polls.archive import archive_polls
+
+
+class Command(BaseCommand):
+    help = (
+        'Move polls nobody has voted on for POLLS_ARCHIVE AFTER seconds '
+        'into the archive, a batch per transaction'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to wait between batches'
+        )
+
+    def handle(self, *args, batch_size, pause, **options):
+        archived = archive_polls(batch_size=batch_size, pause=pause)
+        self.stdout.write(f'Archived {archived} polls')
@@ -0,0 +1,48 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from polls.benchmarks import BENCHMARKS
+from polls.benchmarks.base import find_regressions
+
+
+class Command(BaseCommand):
+    help = 'Run a benchmark against the configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--save-baseline', metavar='PATH',
+            help='Write the results to PATH for later runs to compare with'
+        )
+        parser.add_argument(
+            '--baseline', metavar='PATH',
+            help='Fail if any metric regressed compared to these results'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed regression against the baseline, as a fraction'
+        )
+        subparsers = parser.add_subparsers(dest='benchmark')
+        subparsers.required = True
+        for name, benchmark in BENCHMARKS.items():
+            benchmark.add_arguments(
+                subparsers.add_parser(name, help=benchmark.help)
+            )
+
+    def handle(self, *args, benchmark, save_baseline, baseline, tolerance,
+               **options):
+        results = BENCHMARKS[benchmark].run(**options)
+        output = json.dumps(results, indent=2)
+        self.stdout.write(output)
+        if save_baseline:
+            with open(save_baseline, 'w') as f:
+                f.write(output + '\n')
+
+        if baseline:
+            with open(baseline) as f:
+                regressions = find_regressions(
+                    results, json.load(f), tolerance
+                )
+            if regressions:
+                raise CommandError(
+                    'Regressed against the baseline:\n'
+                    + '\n'.join(regressions)
+                )
@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from polls.votes import compact_shards
+
+
+class Command(BaseCommand):
+    help = 'Fold votes waiting in choice shards back into Choice.votes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--every', type=float, metavar='SECONDS',
+            help='Keep running and compact again after this many seconds'
+        )
+
+    def handle(self, *args, batch_size, every, **options):
+        while True:
+            folded = compact_shards(batch_size=batch_size)
+            self.stdout.write(f'Compacted {folded} votes')
+            if not every:
+                return
+            time.sleep(every)
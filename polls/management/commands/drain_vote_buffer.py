@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from polls.buffer import drain_journals
+
+
+class Command(BaseCommand):
+    help = (
+        'Write votes left in vote buffer journals by stopped or crashed '
+        'workers to the database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--journal-dir',
+            default=settings.POLLS_VOTE_BUFFER['JOURNAL_DIR'],
+            help='Defaults to POLLS_VOTE_BUFFER["JOURNAL_DIR"]'
+        )
+
+    def handle(self, *args, journal_dir, **options):
+        if not journal_dir:
+            self.stderr.write('No vote buffer journal directory configured')
+            return
+        drained = drain_journals(journal_dir)
+        self.stdout.write(f'Drained {drained} votes')
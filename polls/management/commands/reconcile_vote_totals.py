@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from polls.votes import reconcile_totals
+
+
+class Command(BaseCommand):
+    help = (
+        'Check Poll.total_votes against the choice counters and repair '
+        'any drift'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report the polls that drifted'
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        checked, drifted = reconcile_totals(
+            batch_size=batch_size,
+            repair=not dry_run
+        )
+        action = 'found' if dry_run else 'repaired'
+        self.stdout.write(
+            f'Checked {checked} polls, {action} {drifted} with drift'
+        )
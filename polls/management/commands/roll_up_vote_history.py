@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from polls.history import roll_up_history
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll old per minute vote counts up into hours and days and drop '
+        'the ones past POLLS_VOTE_HISTORY retention'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        rolled, expired = roll_up_history(batch_size=batch_size)
+        self.stdout.write(
+            f'Rolled up {rolled} vote counts, expired {expired}'
+        )
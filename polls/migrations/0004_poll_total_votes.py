@@ -0,0 +1,32 @@
+# Generated by Django 2.2.24 on 2026-10-18 02:01
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def count_total_votes(apps, schema_editor):
+    Poll = apps.get_model('polls', 'Poll')
+    Choice = apps.get_model('polls', 'Choice')
+    Poll.objects.update(total_votes=Coalesce(Subquery(
+        Choice.objects.filter(poll=OuterRef('pk')).order_by().values(
+            'poll'
+        ).annotate(total=Sum('votes')).values('total'),
+        output_field=models.IntegerField()
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0003_choiceshard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='total_votes',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(count_total_votes, migrations.RunPython.noop),
+    ]
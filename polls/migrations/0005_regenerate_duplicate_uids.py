@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.db.models import Count
+import polls.models
+
+
+def regenerate_duplicate_uids(apps, schema_editor):
+    Poll = apps.get_model('polls', 'Poll')
+    duplicates = Poll.objects.values('uid').annotate(
+        count=Count('id')
+    ).filter(count__gt=1).values_list('uid', flat=True)
+    for uid in list(duplicates):
+        # the oldest poll keeps its uid, it is the one people shared first
+        for poll in Poll.objects.filter(uid=uid).order_by('id')[1:]:
+            poll.uid = polls.models.short_urltoken()
+            while Poll.objects.filter(uid=poll.uid).exists():
+                poll.uid = polls.models.short_urltoken()
+            poll.save(update_fields=['uid'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_poll_total_votes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            regenerate_duplicate_uids,
+            migrations.RunPython.noop
+        ),
+    ]
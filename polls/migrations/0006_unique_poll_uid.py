@@ -0,0 +1,19 @@
+# Generated by Django 2.2.24 on 2026-10-18 02:03
+
+from django.db import migrations, models
+import polls.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_regenerate_duplicate_uids'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='poll',
+            name='uid',
+            field=models.CharField(default=polls.models.short_urltoken, max_length=40, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.24 on 2026-10-18 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0006_unique_poll_uid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='poll',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='date published'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0007_poll_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
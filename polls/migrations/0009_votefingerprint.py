@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_poll_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteFingerprint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=32)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='polls.poll', to_field='uid')),
+            ],
+            options={
+                'unique_together': {('poll', 'fingerprint')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0009_votefingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveIntegerField()),
+                ('start', models.DateTimeField()),
+                ('votes', models.IntegerField(default=0)),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_counts', to='polls.choice')),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_counts', to='polls.poll', to_field='uid')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='votecount',
+            index=models.Index(fields=['poll', 'start'], name='polls_votec_poll_id_859d92_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='votecount',
+            index=models.Index(fields=['resolution', 'start'], name='polls_votec_resolut_41020d_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='votecount',
+            unique_together={('choice', 'resolution', 'start')},
+        ),
+    ]
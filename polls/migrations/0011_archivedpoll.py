@@ -0,0 +1,53 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:52
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill_last_vote(apps, schema_editor):
+    # polls voted on before last_vote existed get their newest vote from
+    # the history, or now, so none of them look stale to polls.archive yet
+    Poll = apps.get_model('polls', 'Poll')
+    VoteCount = apps.get_model('polls', 'VoteCount')
+    newest = VoteCount.objects.filter(
+        poll_id=OuterRef('uid')
+    ).order_by().values('poll_id').annotate(
+        newest=Max('start')
+    ).values('newest')
+    Poll.objects.filter(total_votes__gt=0).update(
+        last_vote=Coalesce(
+            Subquery(newest, output_field=models.DateTimeField()),
+            timezone.now()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0010_votecount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPoll',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('uid', models.CharField(max_length=40, unique=True)),
+                ('text', models.CharField(max_length=200)),
+                ('pub_date', models.DateTimeField(verbose_name='date published')),
+                ('total_votes', models.IntegerField(default=0)),
+                ('last_vote', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('choices', models.JSONField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='poll',
+            name='last_vote',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_last_vote, migrations.RunPython.noop),
+    ]
@@ -1,18 +1,153 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from collections import Counter, defaultdict
+from datetime import datetime
 import secrets
 
+UID_ATTEMPTS = 5
+
 
 def short_urltoken():
     return secrets.token_urlsafe(8)
 
 
+def sum_votes(model, **filters):
+    return Coalesce(Subquery(
+        model.objects.filter(**filters).order_by().values(
+            *filters
+        ).annotate(total=Sum('votes')).values('total'),
+        output_field=models.IntegerField()
+    ), 0)
+
+
+def bucket_start(moment, resolution):
+    # buckets are aligned in UTC, so days start at midnight UTC
+    seconds = moment.timestamp() // resolution * resolution
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+def increment(queryset, field, counts, key='pk', **updates):
+    # one UPDATE per distinct increment rather than one per row, a batch
+    # of votes usually only has a handful of distinct counts
+    by_increment = defaultdict(list)
+    for value, amount in counts.items():
+        by_increment[amount].append(value)
+    updated = 0
+    for amount, values in by_increment.items():
+        updated += queryset.filter(**{f'{key}__in': values}).update(
+            **{field: F(field) + amount}, **updates
+        )
+    return updated
+
+
+class PollQuerySet(models.QuerySet):
+
+    def create_unique(self, **kwargs):
+        # uids are random, so on the rare collision just draw another one
+        for attempt in range(UID_ATTEMPTS):
+            poll = self.model(uid=short_urltoken(), **kwargs)
+            try:
+                with transaction.atomic(using=self.db):
+                    poll.save(force_insert=True, using=self.db)
+                return poll
+            except IntegrityError:
+                collided = self.filter(uid=poll.uid).exists()
+                if not collided or attempt == UID_ATTEMPTS - 1:
+                    raise
+
+    def bulk_create_unique(self, polls):
+        for attempt in range(UID_ATTEMPTS):
+            uids = [short_urltoken() for _ in polls]
+            for poll, uid in zip(polls, uids):
+                poll.uid = uid
+            try:
+                with transaction.atomic(using=self.db):
+                    self.bulk_create(polls)
+                break
+            except IntegrityError:
+                collided = len(set(uids)) < len(uids) or self.filter(
+                    uid__in=uids
+                ).exists()
+                if not collided or attempt == UID_ATTEMPTS - 1:
+                    raise
+
+        # not every database returns ids from bulk inserts
+        if polls and polls[0].pk is None:
+            ids = dict(self.filter(uid__in=uids).values_list('uid', 'id'))
+            for poll in polls:
+                poll.pk = ids[poll.uid]
+        return polls
+
+    def with_choices(self):
+        return self.prefetch_related(
+            Prefetch('choices', queryset=Choice.objects.with_votes())
+        )
+
+    def recount_votes(self):
+        # rebuild the denormalized total from the choice counters
+        return self.update(
+            total_votes=sum_votes(Choice, poll=OuterRef('pk')),
+            version=F('version') + 1
+        )
+
+
 class Poll(models.Model):
     text = models.CharField(max_length=200)
-    pub_date = models.DateTimeField('date published', auto_now_add=True)
+    pub_date = models.DateTimeField(
+        'date published',
+        auto_now_add=True,
+        db_index=True
+    )
     uid = models.CharField(
         default=short_urltoken,
-        max_length=40
+        max_length=40,
+        unique=True
     )
+    # kept in step with the choice counters by every vote path, so the
+    # popular polls are an indexed read instead of an aggregate
+    total_votes = models.IntegerField(default=0, db_index=True)
+    # bumped in the same UPDATE as total_votes, caches of anything
+    # derived from the vote counts are keyed off it
+    version = models.BigIntegerField(default=0)
+    # also set along with total_votes, polls.archive moves polls nobody
+    # voted on for a while out of the poll and choice tables
+    last_vote = models.DateTimeField(null=True, blank=True)
+
+    # true for the read only polls polls.archive unpacks from ArchivedPoll
+    archived = False
+
+    objects = PollQuerySet.as_manager()
+
+
+class ChoiceQuerySet(models.QuerySet):
+
+    def with_votes(self):
+        # votes waiting in shards are included until they are compacted
+        current_votes = F('votes')
+        if settings.POLLS_VOTE_SHARDS:
+            current_votes += sum_votes(ChoiceShard, choice=OuterRef('pk'))
+        return self.annotate(current_votes=current_votes)
+
+    def add_votes(self, counts):
+        # counts maps choice ids to the number of votes to add to them
+        poll_counts = Counter()
+        history = {}
+        for choice_id, poll_id, uid in self.filter(
+            id__in=counts
+        ).values_list('id', 'poll_id', 'poll__uid'):
+            poll_counts[poll_id] += counts[choice_id]
+            history[uid, choice_id] = counts[choice_id]
+        with transaction.atomic():
+            increment(self, 'votes', counts)
+            increment(
+                Poll.objects.all(), 'total_votes', poll_counts,
+                version=F('version') + 1,
+                last_vote=timezone.now()
+            )
+            VoteCount.objects.record(history)
 
 
 class Choice(models.Model):
@@ -24,5 +159,117 @@ class Choice(models.Model):
     text = models.CharField(blank=False, max_length=200)
     votes = models.IntegerField(default=0)
 
+    objects = ChoiceQuerySet.as_manager()
+
     class Meta:
         ordering = ('id',)
+
+
+class ChoiceShard(models.Model):
+    choice = models.ForeignKey(
+        Choice,
+        related_name='shards',
+        on_delete=models.CASCADE
+    )
+    slot = models.PositiveSmallIntegerField()
+    votes = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('choice', 'slot')
+
+
+class VoteFingerprint(models.Model):
+    # the exact record of who voted on a poll, behind the in memory filters
+    # in polls.dedup
+    poll = models.ForeignKey(
+        Poll,
+        to_field='uid',
+        related_name='fingerprints',
+        on_delete=models.CASCADE
+    )
+    fingerprint = models.CharField(max_length=32)
+
+    class Meta:
+        unique_together = ('poll', 'fingerprint')
+
+
+class VoteCountQuerySet(models.QuerySet):
+
+    def add_votes(self, counts, resolution, start):
+        # counts maps (poll uid, choice id) pairs to the votes to add
+        if not counts:
+            return
+        bucket = self.filter(resolution=resolution, start=start)
+        votes = {choice_id: count for (_, choice_id), count in counts.items()}
+        with transaction.atomic(using=self.db, savepoint=False):
+            savepoint = transaction.savepoint(using=self.db)
+            updated = increment(bucket, 'votes', votes, key='choice_id')
+            if updated == len(votes):
+                transaction.savepoint_commit(savepoint, using=self.db)
+                return
+            # some buckets are new, so the increments are undone, the
+            # missing buckets created empty, leaving alone any another
+            # vote created meanwhile, and every bucket incremented again
+            transaction.savepoint_rollback(savepoint, using=self.db)
+            self.bulk_create([
+                self.model(
+                    poll_id=uid,
+                    choice_id=choice_id,
+                    resolution=resolution,
+                    start=start
+                )
+                for uid, choice_id in counts
+            ], ignore_conflicts=True)
+            increment(bucket, 'votes', votes, key='choice_id')
+
+    def record(self, counts):
+        if settings.POLLS_VOTE_HISTORY['ENABLED']:
+            start = bucket_start(timezone.now(), self.model.MINUTE)
+            self.add_votes(counts, self.model.MINUTE, start)
+
+
+class VoteCount(models.Model):
+    # votes a choice got in the bucket starting at start and lasting
+    # resolution seconds, votes are counted per minute and rolled up into
+    # hours and days as they age, see polls.history
+    MINUTE = 60
+    HOUR = 60 * 60
+    DAY = 60 * 60 * 24
+
+    poll = models.ForeignKey(
+        Poll,
+        to_field='uid',
+        related_name='vote_counts',
+        on_delete=models.CASCADE
+    )
+    choice = models.ForeignKey(
+        Choice,
+        related_name='vote_counts',
+        on_delete=models.CASCADE
+    )
+    resolution = models.PositiveIntegerField()
+    start = models.DateTimeField()
+    votes = models.IntegerField(default=0)
+
+    objects = VoteCountQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('choice', 'resolution', 'start')
+        indexes = [
+            models.Index(fields=['poll', 'start']),
+            models.Index(fields=['resolution', 'start']),
+        ]
+
+
+class ArchivedPoll(models.Model):
+    # a poll and its choices packed into one row once nobody votes on it
+    # anymore, keeping the ids it had, see polls.archive
+    id = models.IntegerField(primary_key=True)
+    uid = models.CharField(max_length=40, unique=True)
+    text = models.CharField(max_length=200)
+    pub_date = models.DateTimeField('date published')
+    total_votes = models.IntegerField(default=0)
+    last_vote = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # the choices as {'id', 'text', 'votes'} objects in id order
+    choices = models.JSONField()
@@ -0,0 +1,20 @@
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from polls import buffer, dedup, live, ratelimit
+
+# Objects built from settings are kept for the life of the process, so
+# they have to be rebuilt when tests and benchmarks override the settings.
+# Only they import this, the site itself never changes its settings and
+# so never pays for importing django.test.
+RESETS = {
+    'POLLS_LIVE_RESULTS': live.reset_live_results,
+    'POLLS_RATE_LIMITS': ratelimit.reset_rules,
+    'POLLS_VOTE_BUFFER': buffer.shutdown,
+    'POLLS_VOTE_DEDUP': dedup.reset_vote_filters,
+}
+
+
+@receiver(setting_changed)
+def reset_from_settings(setting, **kwargs):
+    if setting in RESETS:
+        RESETS[setting]()
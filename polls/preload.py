@@ -0,0 +1,18 @@
+from importlib import import_module
+from django.conf import settings
+from django.urls import get_resolver
+
+# What a worker otherwise imports on its first requests. With gunicorn's
+# preload_app the master runs this once before forking, so every worker
+# starts with it already in memory, shared until a worker writes to it.
+MODULES = ['polls.api']
+
+
+def preload():
+    get_resolver().url_patterns
+    for module in MODULES:
+        import_module(module)
+    if settings.POLLS_RESULTS_CHART['RENDERER'] == 'pygal':
+        from polls.charts import get_custom_style
+        import_module('pygal')
+        get_custom_style()
@@ -0,0 +1,124 @@
+import asyncio
+import math
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+def client_address(request):
+    # behind POLLS_TRUSTED_PROXIES proxies the client is the address the
+    # outermost of them saw, REMOTE_ADDR is just the nearest proxy
+    proxies = settings.POLLS_TRUSTED_PROXIES
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        return addresses[-min(proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class TokenBucket:
+    # RATE tokens a second up to BURST, the state lives in a cache so every
+    # worker draws from the same bucket. Reading and writing it is not
+    # atomic, racing requests can occasionally both take the last token.
+
+    def __init__(self, cache, rate, burst):
+        self.cache = cache
+        self.rate = rate
+        self.burst = burst
+        # an untouched bucket is full again after this long
+        self.timeout = math.ceil(burst / rate) + 1
+
+    def take(self, key, now=None):
+        # returns 0 if a token was taken, otherwise seconds to wait for one
+        now = time.time() if now is None else now
+        tokens, updated = self.cache.get(key) or (self.burst, now)
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            return (1 - tokens) / self.rate
+        self.cache.set(key, (tokens - 1, now), self.timeout)
+        return 0
+
+
+class Rule:
+
+    def __init__(self, name, options, cache):
+        self.name = name
+        self.methods = set(options['METHODS'])
+        self.bucket = TokenBucket(cache, options['RATE'], options['BURST'])
+
+
+_rules = None
+
+
+def get_rules():
+    # rules by view name, so a request only looks at the ones for its view
+    global _rules
+    if _rules is None:
+        options = settings.POLLS_RATE_LIMITS
+        cache = caches[options['CACHE']]
+        _rules = {}
+        for name, rule_options in options['RULES'].items():
+            rule = Rule(name, rule_options, cache)
+            for view in rule_options['VIEWS']:
+                _rules.setdefault(view, []).append(rule)
+    return _rules
+
+
+def reset_rules():
+    global _rules
+    _rules = None
+
+
+class RateLimitMiddleware:
+    # runs once the view is resolved and before it is called, so limited
+    # requests never reach the database
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        rules = self.rules(request)
+        return self.limit(request, rules) if rules else None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # the buckets can be a network round trip away, so they are not
+        # taken on the thread Django shares between requests
+        rules = self.rules(request)
+        if not rules:
+            return None
+        return await sync_to_async(self.limit, thread_sensitive=False)(
+            request, rules
+        )
+
+    def rules(self, request):
+        if not settings.POLLS_RATE_LIMITS['ENABLED']:
+            return []
+        return [
+            rule
+            for rule in get_rules().get(request.resolver_match.view_name, ())
+            if request.method in rule.methods
+        ]
+
+    def limit(self, request, rules):
+        for rule in rules:
+            key = f'polls:ratelimit:{rule.name}:{client_address(request)}'
+            wait = rule.bucket.take(key)
+            if wait:
+                response = HttpResponse(
+                    'Too many requests, slow down',
+                    content_type='text/plain',
+                    status=429
+                )
+                response['Retry-After'] = math.ceil(wait)
+                return response
+        return None
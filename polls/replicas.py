@@ -0,0 +1,93 @@
+import asyncio
+import random
+from contextvars import ContextVar
+from django.conf import settings
+
+PIN_COOKIE = 'primary'
+
+_replica = ContextVar('replica', default=None)
+
+
+class ReplicaRouter:
+    # reads go to the replica ReplicaMiddleware picked for the
+    # request, everything else to the primary
+
+    def db_for_read(self, model, **hints):
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        # otherwise saving an object read from a replica writes it there
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # replicas get the schema by replicating the primary
+        return db == 'default'
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = _replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica.reset(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        token = _replica.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica.reset(token)
+        return self.pin(request, response)
+
+    def pin(self, request, response):
+        options = settings.POLLS_READ_REPLICAS
+        if options['ALIASES'] and response.status_code < 400 and (
+            request.method not in ('GET', 'HEAD', 'OPTIONS')
+        ):
+            # read your writes, the client stays on the primary until the
+            # replicas have caught up with what it just changed
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=options['PIN_SECONDS'],
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.pick_replica(request)
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # only picks an alias, no need for a thread
+        self.pick_replica(request)
+        return None
+
+    def pick_replica(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return
+        if PIN_COOKIE in request.COOKIES:
+            return
+        options = settings.POLLS_READ_REPLICAS
+        if request.resolver_match.view_name not in options['VIEWS']:
+            return
+        if options['ALIASES']:
+            _replica.set(random.choice(options['ALIASES']))
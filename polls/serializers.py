@@ -1,13 +1,44 @@
+from django.conf import settings
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from polls.models import Poll, Choice
+from polls.history import RESOLUTIONS
+from polls.models import ArchivedPoll, Poll, Choice
 
 
 class ChoiceSerializer(serializers.ModelSerializer):
+    votes = serializers.SerializerMethodField()
 
     class Meta:
         model = Choice
         fields = ('id', 'text', 'votes')
-        read_only_fields = ('votes',)
+
+    def get_votes(self, choice):
+        if hasattr(choice, 'current_votes'):
+            return choice.current_votes
+        if settings.POLLS_VOTE_SHARDS:
+            return Choice.objects.with_votes().get(id=choice.id).current_votes
+        return choice.votes
+
+
+class PollListSerializer(serializers.ListSerializer):
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            polls = Poll.objects.bulk_create_unique([
+                Poll(**{
+                    field: value for field, value in data.items()
+                    if field != 'choices'
+                })
+                for data in validated_data
+            ])
+            Choice.objects.bulk_create([
+                Choice(poll=poll, **choice_data)
+                for poll, data in zip(polls, validated_data)
+                for choice_data in data['choices']
+            ])
+        return polls
 
 
 class PollSerializer(serializers.ModelSerializer):
@@ -17,6 +48,7 @@ class PollSerializer(serializers.ModelSerializer):
         model = Poll
         fields = ('id', 'uid', 'text', 'pub_date', 'choices')
         read_only_fields = ('id', 'uid', 'pub_date')
+        list_serializer_class = PollListSerializer
 
     def validate(self, data):
         if len(data['choices']) < 2:
@@ -25,7 +57,53 @@ class PollSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         choices_data = validated_data.pop('choices')
-        poll = Poll.objects.create(**validated_data)
-        for choice_data in choices_data:
-            Choice.objects.create(poll=poll, **choice_data)
+        poll = Poll.objects.create_unique(**validated_data)
+        Choice.objects.bulk_create([
+            Choice(poll=poll, **choice_data) for choice_data in choices_data
+        ])
         return poll
+
+
+class ArchivedPollSerializer(serializers.ModelSerializer):
+    # the same shape as PollSerializer, the choices already have their votes
+
+    class Meta:
+        model = ArchivedPoll
+        fields = ('id', 'uid', 'text', 'pub_date', 'choices')
+
+
+class PollListQuerySerializer(serializers.Serializer):
+    cursor = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=500, default=50)
+    created_after = serializers.DateTimeField(required=False)
+    min_votes = serializers.IntegerField(min_value=0, required=False)
+
+
+class HistoryQuerySerializer(serializers.Serializer):
+    # keeps a single response to a bounded number of buckets
+    MAX_BUCKETS = 1500
+
+    resolution = serializers.ChoiceField(
+        choices=sorted(RESOLUTIONS),
+        default='hour'
+    )
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        seconds = RESOLUTIONS[data['resolution']]
+        data.setdefault('until', timezone.now())
+        data.setdefault(
+            'since', data['until'] - timedelta(seconds=seconds * 48)
+        )
+        # answer in UTC like the bucket starts, whatever the request used
+        data['since'] = data['since'].astimezone(timezone.utc)
+        data['until'] = data['until'].astimezone(timezone.utc)
+        if data['since'] >= data['until']:
+            raise serializers.ValidationError('since must be before until')
+        buckets = (data['until'] - data['since']).total_seconds() / seconds
+        if buckets > self.MAX_BUCKETS:
+            raise serializers.ValidationError(
+                f'At most {self.MAX_BUCKETS} {data["resolution"]}s at a time'
+            )
+        return data
@@ -0,0 +1,99 @@
+import math
+from django.utils.html import escape
+
+# laid out and styled like a pygal Pie in the style polls.charts gives it,
+# so switching renderer does not change how the results page looks
+WIDTH = 800
+HEIGHT = 600
+MARGIN = 20
+LEGEND_ROW = 21
+# pygal estimates text as this wide per character at its 14px font and
+# cuts legends down to LEGEND_LENGTH characters
+CHARACTER_WIDTH = 8.4
+LEGEND_LENGTH = 15
+
+STYLE = (
+    '<style>'
+    'text{fill:white;font-size:14px;'
+    'font-family:Consolas,"Liberation Mono",Menlo,Courier,monospace}'
+    '.no-data{font-size:64px;text-anchor:middle}'
+    '.slice{fill-opacity:.7;stroke-opacity:.8;transition:100ms ease-in}'
+    '.slice:hover{fill-opacity:.25}'
+    '</style>'
+)
+
+
+def point(cx, cy, radius, angle):
+    # angles go clockwise from twelve o'clock like pygal's slices
+    return (
+        f'{cx + radius * math.sin(angle):.2f} '
+        f'{cy - radius * math.cos(angle):.2f}'
+    )
+
+
+def render_slice(cx, cy, radius, start, end, color, title):
+    if end - start >= 2 * math.pi - 1e-9:
+        tag = 'circle'
+        shape = f'cx="{cx:.2f}" cy="{cy:.2f}" r="{radius:.2f}"'
+    else:
+        tag = 'path'
+        large = int(end - start > math.pi)
+        shape = (
+            f'd="M{cx:.2f} {cy:.2f} '
+            f'L{point(cx, cy, radius, start)} '
+            f'A{radius:.2f} {radius:.2f} 0 {large} 1 '
+            f'{point(cx, cy, radius, end)}z"'
+        )
+    return (
+        f'<{tag} {shape} class="slice" fill="{color}" stroke="{color}">'
+        f'<title>{title}</title></{tag}>'
+    )
+
+
+def legend(text):
+    if len(text) > LEGEND_LENGTH:
+        return text[:LEGEND_LENGTH - 1] + '\u2026'
+    return text
+
+
+def render_pie(slices):
+    # slices are (text, votes, color) tuples in legend order
+    longest = max((len(legend(text)) for text, _, _ in slices), default=0)
+    left = round(MARGIN + 22 + longest * CHARACTER_WIDTH, 1)
+    width = WIDTH - left - MARGIN
+    height = HEIGHT - 2 * MARGIN
+    cx = left + width / 2
+    cy = MARGIN + height / 2
+    radius = min(width, height) / 2 * 0.9
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'viewBox="0 0 {WIDTH} {HEIGHT}">',
+        STYLE,
+        f'<rect x="{left}" y="{MARGIN}" width="{width:.1f}" '
+        f'height="{height}" fill="#2b2b2b"/>',
+    ]
+    total = sum(votes for _, votes, _ in slices)
+    if not total:
+        parts.append(
+            f'<text class="no-data" x="{WIDTH / 2:g}" y="{HEIGHT / 2:g}">'
+            'No data</text>'
+        )
+    angle = 0
+    for text, votes, color in slices:
+        if votes <= 0 or not total:
+            continue
+        end = angle + 2 * math.pi * votes / total
+        parts.append(render_slice(
+            cx, cy, radius, angle, end, color, f'{escape(text)}: {votes}'
+        ))
+        angle = end
+    for i, (text, _, color) in enumerate(slices):
+        y = 30 + i * LEGEND_ROW
+        parts.append(
+            f'<rect x="10" y="{y + 1}" width="12" height="12" '
+            f'fill="{color}" fill-opacity=".7"/>'
+            f'<text x="27" y="{y + 11.2:.1f}">{escape(legend(text))}</text>'
+        )
+    parts.append('</svg>')
+    return ''.join(parts)
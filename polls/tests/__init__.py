@@ -0,0 +1 @@
+import polls.overrides  # noqa: F401
@@ -0,0 +1,21 @@
+from django.core.cache import cache
+
+
+class QueryBudgetMixin:
+    # per view query budgets, checked against the queries counted by
+    # polls.timing.RequestTimingMiddleware
+    query_budgets = {}
+
+    def setUp(self):
+        super().setUp()
+        # budgets are for a cold cache
+        cache.clear()
+
+    def assertQueryBudget(self, response):
+        view = response.resolver_match.view_name
+        budget = self.query_budgets[view]
+        self.assertLessEqual(
+            response.timings.queries, budget,
+            f'{view} ran {response.timings.queries} queries, '
+            f'its budget is {budget}'
+        )
@@ -0,0 +1,179 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from polls.archive import archive_polls
+from polls.cache import get_poll_data
+from polls.models import ArchivedPoll, Choice, ChoiceShard, Poll
+from polls.views import POLL_CLOSED
+from polls.votes import record_vote
+
+
+def make_poll(text, votes, days_since_vote=None, age=365):
+    poll = Poll.objects.create(text=text, total_votes=sum(votes))
+    Choice.objects.bulk_create(
+        Choice(poll=poll, text=f'{text} {i}', votes=count)
+        for i, count in enumerate(votes)
+    )
+    now = timezone.now()
+    Poll.objects.filter(id=poll.id).update(
+        pub_date=now - timedelta(days=age),
+        last_vote=(
+            None if days_since_vote is None
+            else now - timedelta(days=days_since_vote)
+        )
+    )
+    return Poll.objects.get(id=poll.id)
+
+
+class ArchivePollsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.old = make_poll('Old', [3, 5], days_since_vote=200)
+        self.old_choices = list(
+            self.old.choices.values('id', 'text', 'votes')
+        )
+        self.recent = make_poll('Recent', [1, 1], days_since_vote=2)
+        self.unvoted = make_poll('Unvoted', [0, 0])
+
+    def test_archives_stale_polls(self):
+        self.assertEqual(archive_polls(), 2)
+
+        self.assertEqual(
+            list(Poll.objects.values_list('uid', flat=True)),
+            [self.recent.uid]
+        )
+        archived = ArchivedPoll.objects.get(uid=self.old.uid)
+        self.assertEqual(archived.id, self.old.id)
+        self.assertEqual(archived.total_votes, 8)
+        self.assertEqual(archived.pub_date, self.old.pub_date)
+        self.assertEqual(archived.choices, self.old_choices)
+        self.assertFalse(Choice.objects.filter(poll_id=self.old.id).exists())
+
+    def test_new_polls_are_kept(self):
+        fresh = make_poll('Fresh', [0, 0], age=1)
+        archive_polls()
+        self.assertTrue(Poll.objects.filter(id=fresh.id).exists())
+
+    def test_keeps_polls_with_votes_in_shards(self):
+        choice = self.old.choices.first()
+        ChoiceShard.objects.create(choice=choice, slot=0, votes=1)
+        self.assertEqual(archive_polls(), 1)
+        self.assertTrue(Poll.objects.filter(id=self.old.id).exists())
+
+    def test_archives_in_batches(self):
+        make_poll('Older', [1, 1], days_since_vote=300)
+        self.assertEqual(archive_polls(batch_size=1), 3)
+        self.assertEqual(ArchivedPoll.objects.count(), 3)
+
+    def test_votes_keep_polls_out(self):
+        record_vote(self.old.uid, self.old.choices.first().id)
+        self.old.refresh_from_db()
+        self.assertGreater(
+            self.old.last_vote, timezone.now() - timedelta(minutes=1)
+        )
+        self.assertEqual(archive_polls(), 1)
+
+    def test_drops_cached_poll_data(self):
+        get_poll_data(self.old.uid)
+        archive_polls()
+        self.assertTrue(get_poll_data(self.old.uid)['archived'])
+
+    def test_command(self):
+        out = StringIO()
+        call_command('archive_polls', '--batch-size', '1', stdout=out)
+        self.assertEqual(out.getvalue(), 'Archived 2 polls\n')
+
+
+class ArchivedPollViewsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.poll = make_poll('Cake or pie?', [3, 5], days_since_vote=200)
+        self.choices = list(self.poll.choices.all())
+
+    def archive(self):
+        archive_polls()
+        cache.clear()
+
+    def test_detail_api_is_unchanged(self):
+        url = f'/api/v1/poll/{self.poll.uid}'
+        before = self.client.get(url)
+        self.archive()
+        after = self.client.get(url)
+
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.json(), before.json())
+        self.assertEqual(after['ETag'], before['ETag'])
+
+    def test_detail_api_from_a_stale_cache(self):
+        # the archive runs in another process, this one keeps its cache
+        url = f'/api/v1/poll/{self.poll.uid}'
+        before = self.client.get(url)
+        stale = cache.get(f'polls:poll:{self.poll.uid}')
+        archive_polls()
+        cache.set(f'polls:poll:{self.poll.uid}', stale)
+
+        after = self.client.get(url)
+        self.assertEqual(after.json(), before.json())
+        self.assertTrue(get_poll_data(self.poll.uid)['archived'])
+
+    def test_poll_page_from_a_stale_cache(self):
+        self.client.get(f'/poll/{self.poll.uid}')
+        stale = cache.get(f'polls:poll:{self.poll.uid}')
+        archive_polls()
+        cache.set(f'polls:poll:{self.poll.uid}', stale)
+        # pages are only rechecked once their live check expires
+        cache.delete(f'polls:live:{self.poll.uid}')
+
+        response = self.client.get(f'/poll/{self.poll.uid}')
+        self.assertContains(response, 'name="poll-closed"')
+        self.assertNotContains(response, 'name="vote"')
+
+    def test_results_api_is_unchanged(self):
+        url = f'/api/v1/poll/{self.poll.uid}/results'
+        before = self.client.get(url)
+        self.archive()
+        self.assertEqual(self.client.get(url).json(), before.json())
+
+    def test_poll_page_is_read_only(self):
+        self.archive()
+        response = self.client.get(f'/poll/{self.poll.uid}')
+        self.assertContains(response, 'name="poll-closed"')
+        self.assertNotContains(response, 'name="vote"')
+        self.assertContains(response, 'name="choice_label">Cake or pie? 1<')
+
+    def test_votes_are_refused(self):
+        self.archive()
+        response = self.client.post(
+            f'/poll/{self.poll.uid}',
+            {'choice_id': self.choices[0].id},
+            follow=True
+        )
+        self.assertRedirects(response, f'/poll/{self.poll.uid}/results')
+        self.assertContains(response, POLL_CLOSED)
+        self.assertContains(response, '3 Votes')
+
+    def test_results_page(self):
+        self.archive()
+        response = self.client.get(f'/poll/{self.poll.uid}/results')
+        self.assertEqual(
+            [choice.id for choice in response.context['poll'].color_choices],
+            [self.choices[1].id, self.choices[0].id]
+        )
+        self.assertEqual(response.context['poll'].total_votes, 8)
+        chart = self.client.get(f'/poll/{self.poll.uid}/results/chart.svg')
+        self.assertEqual(chart.status_code, 200)
+
+    def test_unknown_polls_are_still_missing(self):
+        self.archive()
+        self.assertEqual(self.client.get('/poll/missing').status_code, 404)
+        self.assertEqual(
+            self.client.get('/poll/missing/results').status_code, 404
+        )
+        self.assertEqual(
+            self.client.get('/api/v1/poll/missing').status_code, 404
+        )
@@ -0,0 +1,151 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from polls.models import Poll, Choice
+from polls.ratelimit import RateLimitMiddleware
+from polls.replicas import ReplicaMiddleware
+from polls.tests.test_ratelimit import RATE_LIMITS
+from polls.timing import RequestTimingMiddleware
+from polls.views import ALREADY_VOTED
+
+
+@override_settings(ROOT_URLCONF='votingsite.asgi_urls')
+class AsyncViewsTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(text='Would you like a cookie?')
+        self.choice = Choice.objects.create(text='Yes', poll=self.poll)
+        Choice.objects.create(text='No', poll=self.poll)
+
+    def votes(self):
+        return Choice.objects.get(id=self.choice.id).votes
+
+    def vote(self):
+        # the async client of Django 3.2 can not post a dict
+        return self.async_client.post(
+            f'/poll/{self.poll.uid}',
+            f'choice_id={self.choice.id}',
+            content_type='application/x-www-form-urlencoded'
+        )
+
+    async def test_poll_page(self):
+        response = await self.async_client.get(f'/poll/{self.poll.uid}')
+        self.assertTemplateUsed(response, 'poll.html')
+        self.assertContains(response, 'Would you like a cookie?')
+
+    async def test_poll_page_unknown_poll(self):
+        response = await self.async_client.get('/poll/missing')
+        self.assertEqual(response.status_code, 404)
+
+    def test_vote_redirects_to_results(self):
+        response = self.client.post(f'/poll/{self.poll.uid}', data={
+            'choice_id': self.choice.id
+        })
+        self.assertRedirects(response, f'/poll/{self.poll.uid}/results')
+        self.assertEqual(Choice.objects.get(id=self.choice.id).votes, 1)
+
+    async def test_vote_from_the_async_view(self):
+        response = await self.vote()
+        self.assertRedirects(
+            response,
+            f'/poll/{self.poll.uid}/results',
+            fetch_redirect_response=False
+        )
+        self.assertEqual(await sync_to_async(self.votes)(), 1)
+
+    @override_settings(POLLS_VOTE_DEDUP=dict(
+        settings.POLLS_VOTE_DEDUP, ENABLED=True
+    ))
+    async def test_repeat_vote_message(self):
+        for _ in range(2):
+            await self.vote()
+        response = await self.async_client.get(
+            f'/poll/{self.poll.uid}/results'
+        )
+        self.assertContains(response, ALREADY_VOTED)
+        self.assertEqual(await sync_to_async(self.votes)(), 1)
+
+    @override_settings(POLLS_RATE_LIMITS=RATE_LIMITS)
+    async def test_votes_are_rate_limited(self):
+        for _ in range(3):
+            response = await self.vote()
+        self.assertEqual(response.status_code, 429)
+
+    async def test_queries_are_timed(self):
+        for url in (
+            f'/poll/{self.poll.uid}',
+            f'/poll/{self.poll.uid}/results',
+            f'/api/v1/poll/{self.poll.uid}',
+        ):
+            response = await self.async_client.get(url)
+            self.assertGreater(response.timings.queries, 0, url)
+            self.assertIn(
+                f'db;desc="{response.timings.queries} queries"',
+                response['Server-Timing']
+            )
+
+    def test_polls_middleware_is_awaited(self):
+        async def get_response(request):
+            pass
+
+        for middleware in (
+            RequestTimingMiddleware,
+            RateLimitMiddleware,
+            ReplicaMiddleware,
+        ):
+            self.assertTrue(
+                asyncio.iscoroutinefunction(middleware(get_response))
+            )
+            self.assertFalse(
+                asyncio.iscoroutinefunction(middleware(lambda r: None))
+            )
+
+    def test_vote_for_other_poll_returns_404(self):
+        other_poll = Poll.objects.create(text='Other')
+        response = self.client.post(f'/poll/{other_poll.uid}', data={
+            'choice_id': self.choice.id
+        })
+        self.assertEqual(response.status_code, 404)
+
+    async def test_results(self):
+        response = await self.async_client.get(
+            f'/poll/{self.poll.uid}/results'
+        )
+        self.assertTemplateUsed(response, 'results.html')
+        self.assertEqual(response.context['poll'], self.poll)
+
+    async def test_poll_detail_api(self):
+        response = await self.async_client.get(
+            f'/api/v1/poll/{self.poll.uid}'
+        )
+        data = response.json()
+        self.assertEqual(data['uid'], self.poll.uid)
+        self.assertEqual(
+            [(c['text'], c['votes']) for c in data['choices']],
+            [('Yes', 0), ('No', 0)]
+        )
+
+    def test_poll_detail_api_etag(self):
+        url = f'/api/v1/poll/{self.poll.uid}'
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    async def test_poll_detail_api_is_read_only(self):
+        response = await self.async_client.post(
+            f'/api/v1/poll/{self.poll.uid}'
+        )
+        self.assertEqual(response.status_code, 405)
+
+    async def test_results_is_read_only(self):
+        response = await self.async_client.post(
+            f'/poll/{self.poll.uid}/results'
+        )
+        self.assertEqual(response.status_code, 405)
+
+    def test_other_routes_still_served(self):
+        response = self.client.get('/api/v1/polls')
+        self.assertEqual(response.status_code, 200)
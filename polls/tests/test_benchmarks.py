@@ -0,0 +1,134 @@
+from django.template.loader import render_to_string
+from django.test import TestCase
+from polls.benchmarks.base import find_regressions
+from polls.benchmarks.data import (
+    BENCHMARK_TEXT,
+    delete_benchmark_polls,
+    generate_polls,
+)
+from polls.benchmarks.endpoints import Endpoints, SCENARIOS
+from polls.benchmarks.forms import PerFieldForm
+from polls.benchmarks.startup import parse_importtime
+from polls.forms import NewPollForm
+from polls.benchmarks.imports import BulkImport
+from polls.models import Choice, Poll
+
+
+class FindRegressionsTest(TestCase):
+    baseline = [
+        {'scenario': 'home', 'requests': 10, 'p50_ms': 2.0,
+         'requests_per_second': 100.0, 'queries_per_request': 1.0},
+        {'scenario': 'vote', 'requests': 10, 'p50_ms': 4.0,
+         'requests_per_second': 50.0, 'queries_per_request': 3.0},
+    ]
+
+    def test_matches_runs_with_the_same_parameters(self):
+        results = [
+            {'scenario': 'vote', 'requests': 10, 'p50_ms': 4.1,
+             'requests_per_second': 70.0, 'queries_per_request': 4.0},
+            {'scenario': 'home', 'requests': 20, 'p50_ms': 9.0,
+             'requests_per_second': 10.0, 'queries_per_request': 9.0},
+        ]
+        self.assertEqual(
+            find_regressions(results, self.baseline, 0.25),
+            [
+                '10 vote queries_per_request: 3.0 -> 4.0',
+                '20 home: not in the baseline',
+            ]
+        )
+
+    def test_slower_throughput_regresses(self):
+        results = [
+            {'scenario': 'home', 'requests': 10, 'p50_ms': 2.0,
+             'requests_per_second': 50.0, 'queries_per_request': 1.0},
+        ]
+        self.assertEqual(
+            find_regressions(results, self.baseline, 0.25),
+            ['10 home requests_per_second: 100.0 -> 50.0']
+        )
+
+    def test_every_benchmark_metric_is_compared(self):
+        baseline = [
+            {'strategy': 'bulk', 'polls': 100, 'seconds': 1.0,
+             'polls_per_second': 100.0},
+            {'strategy': 'atomic', 'expected_votes': 50,
+             'recorded_votes': 50, 'lost_votes': 0},
+        ]
+        results = [
+            {'strategy': 'bulk', 'polls': 100, 'seconds': 5.0,
+             'polls_per_second': 20.0},
+            {'strategy': 'atomic', 'expected_votes': 50,
+             'recorded_votes': 30, 'lost_votes': 20},
+        ]
+        self.assertEqual(find_regressions(results, baseline, 0.25), [
+            '100 bulk seconds: 1.0 -> 5.0',
+            '100 bulk polls_per_second: 100.0 -> 20.0',
+            '50 atomic recorded_votes: 50 -> 30',
+            '50 atomic lost_votes: 0 -> 20',
+        ])
+
+
+class EndpointsTest(TestCase):
+
+    def test_runs_every_scenario(self):
+        results = Endpoints().run(polls=20, choices=2, requests=4)
+
+        self.assertEqual(
+            [result['scenario'] for result in results], sorted(SCENARIOS)
+        )
+        for result in results:
+            self.assertEqual(result['errors'], 0)
+        self.assertFalse(Poll.objects.exists())
+
+
+class BenchmarkDataTest(TestCase):
+
+    def test_only_benchmark_polls_are_deleted(self):
+        mine = Poll.objects.create(text=f'{BENCHMARK_TEXT} of mine')
+        Choice.objects.create(poll=mine, text='Yes')
+        generate_polls(5, choices=2)
+
+        delete_benchmark_polls(batch_size=2)
+        self.assertEqual(list(Poll.objects.all()), [mine])
+        self.assertEqual(Choice.objects.count(), 1)
+
+    def test_import_cleans_up_its_own_polls(self):
+        mine = Poll.objects.create(text=f'{BENCHMARK_TEXT} 0')
+        BulkImport().run(polls=3, choices=2, batch_size=2)
+        self.assertEqual(list(Poll.objects.all()), [mine])
+
+
+class FormsTest(TestCase):
+
+    def test_forms_render_the_same(self):
+        data = {'text': 'Which one?', 'choice_3': 'A', 'choice_9': ''}
+        self.assertHTMLEqual(
+            render_to_string(
+                'new_poll_fields.html', {'form': PerFieldForm(data=data)}
+            ),
+            render_to_string(
+                'new_poll_fields.html', {'form': NewPollForm(data=data)}
+            )
+        )
+
+
+class ParseImporttimeTest(TestCase):
+    output = (
+        'import time: self [us] | cumulative | imported package\n'
+        'import time:       120 |        120 |     polls.svg\n'
+        'import time:       300 |        420 |   polls.charts\n'
+        'import time:      1000 |       1000 | pygal\n'
+        'some other line\n'
+    )
+
+    def test_groups_by_package(self):
+        self.assertEqual(
+            parse_importtime(self.output),
+            {'polls': 420, 'pygal': 1000}
+        )
+
+    def test_groups_by_module(self):
+        self.assertEqual(
+            parse_importtime(self.output, depth=2),
+            {'polls.svg': 120, 'polls.charts': 300, 'pygal': 1000}
+        )
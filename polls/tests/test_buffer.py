@@ -0,0 +1,185 @@
+import os
+import tempfile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from datetime import datetime, timezone
+from unittest.mock import patch
+from polls.buffer import VoteBuffer, drain_journals, get_vote_buffer
+from polls.models import Poll, Choice, VoteCount
+
+NOW = datetime(2021, 3, 4, 5, 6, 7, tzinfo=timezone.utc)
+
+
+class VoteBufferTest(TestCase):
+
+    def setUp(self):
+        poll = Poll.objects.create(text='A')
+        self.choices = [
+            Choice.objects.create(text=str(i), poll=poll)
+            for i in range(3)
+        ]
+
+    def votes(self):
+        return [
+            Choice.objects.get(id=choice.id).votes
+            for choice in self.choices
+        ]
+
+    def test_votes_wait_for_flush(self):
+        buffer = VoteBuffer(flush_interval=0)
+        buffer.add(self.choices[0].id)
+        self.assertEqual(self.votes(), [0, 0, 0])
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.votes(), [1, 0, 0])
+
+    def test_flush_groups_updates_by_increment(self):
+        buffer = VoteBuffer(flush_interval=0)
+        for choice, votes in zip(self.choices, (2, 2, 5)):
+            for _ in range(votes):
+                buffer.add(choice.id)
+        with CaptureQueriesContext(connection) as queries:
+            buffer.flush()
+        updates = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('UPDATE')
+            and 'polls_votecount' not in q['sql']
+        ]
+        # two for the choices and one for their poll
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(self.votes(), [2, 2, 5])
+        self.assertEqual(self.choices[0].poll.total_votes, 0)
+        self.assertEqual(Poll.objects.get().total_votes, 9)
+
+    def test_flush_writes_history_in_a_few_statements(self):
+        poll = Poll.objects.create(text='B')
+        choices = Choice.objects.bulk_create(
+            Choice(text=str(i), poll=poll) for i in range(50)
+        )
+        ids = list(poll.choices.values_list('id', flat=True))
+        buffer = VoteBuffer(flush_interval=0)
+        with patch('polls.models.timezone.now', return_value=NOW):
+            for choice_id in ids:
+                buffer.add(choice_id)
+            # the first votes in a minute create its history rows
+            with CaptureQueriesContext(connection) as first:
+                buffer.flush()
+            for choice_id in ids:
+                buffer.add(choice_id)
+            with CaptureQueriesContext(connection) as second:
+                buffer.flush()
+
+        self.assertLessEqual(len(first), 10)
+        self.assertLessEqual(len(second), 8)
+        self.assertEqual(
+            sorted(VoteCount.objects.values_list('votes', flat=True)),
+            [2] * len(choices)
+        )
+
+    def test_flushes_when_full(self):
+        buffer = VoteBuffer(flush_interval=0, max_pending=3)
+        for _ in range(4):
+            buffer.add(self.choices[1].id)
+        self.assertEqual(self.votes(), [0, 3, 0])
+
+    def test_flush_with_nothing_pending(self):
+        buffer = VoteBuffer(flush_interval=0)
+        with self.assertNumQueries(0):
+            self.assertEqual(buffer.flush(), 0)
+
+    def test_flusher_closes_old_connections(self):
+        buffer = VoteBuffer(flush_interval=0.01)
+        calls = []
+
+        def flush():
+            calls.append('flush')
+            buffer.stopped.set()
+            raise ValueError
+
+        with patch.object(buffer, 'flush', flush), \
+                patch('polls.buffer.connection'), \
+                patch(
+                    'polls.buffer.close_old_connections',
+                    lambda: calls.append('close')
+                ):
+            buffer.run()
+        self.assertEqual(calls, ['close', 'flush', 'close'])
+
+    def test_stop_flushes(self):
+        buffer = VoteBuffer(flush_interval=0)
+        buffer.add(self.choices[2].id)
+        buffer.stop()
+        self.assertEqual(self.votes(), [0, 0, 1])
+
+
+class VoteJournalTest(TestCase):
+
+    def setUp(self):
+        poll = Poll.objects.create(text='A')
+        self.choice = Choice.objects.create(text='A', poll=poll)
+        self.journal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.journal_dir.cleanup)
+
+    def journals(self):
+        return os.listdir(self.journal_dir.name)
+
+    def buffer(self):
+        return VoteBuffer(flush_interval=0, journal_dir=self.journal_dir.name)
+
+    def test_flush_clears_journal(self):
+        buffer = self.buffer()
+        buffer.add(self.choice.id)
+        buffer.flush()
+        buffer.stop()
+        self.assertEqual(self.journals(), [])
+
+    def test_drain_skips_live_journals(self):
+        buffer = self.buffer()
+        buffer.add(self.choice.id)
+        self.assertEqual(drain_journals(self.journal_dir.name), 0)
+        self.assertEqual(len(self.journals()), 1)
+        buffer.stop()
+
+    def test_drain_replays_abandoned_journals(self):
+        buffer = self.buffer()
+        buffer.add(self.choice.id)
+        buffer.add(self.choice.id)
+        # simulate the worker dying before it could flush
+        buffer.journal.file.close()
+
+        self.assertEqual(drain_journals(self.journal_dir.name), 2)
+        self.assertEqual(Choice.objects.get(id=self.choice.id).votes, 2)
+        self.assertEqual(Poll.objects.get().total_votes, 2)
+        self.assertEqual(self.journals(), [])
+
+
+@override_settings(POLLS_VOTE_BUFFER={
+    'ENABLED': True,
+    'FLUSH_INTERVAL': 0,
+    'MAX_PENDING': 1000,
+    'JOURNAL_DIR': None,
+    'FSYNC': False,
+})
+class BufferedVoteViewTest(TestCase):
+
+    def test_vote_is_buffered(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        response = self.client.post(f'/poll/{poll.uid}', data={
+            'choice_id': choice.id
+        })
+        self.assertRedirects(response, f'/poll/{poll.uid}/results')
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 0)
+
+        get_vote_buffer().flush()
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 1)
+
+    def test_choice_from_another_poll_returns_404(self):
+        poll = Poll.objects.create(text='A')
+        other_poll = Poll.objects.create(text='B')
+        choice = Choice.objects.create(text='123', poll=other_poll)
+        response = self.client.post(f'/poll/{poll.uid}', data={
+            'choice_id': choice.id
+        })
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(get_vote_buffer().flush(), 0)
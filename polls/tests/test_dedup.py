@@ -0,0 +1,103 @@
+from django.test import TestCase
+from polls.dedup import (
+    BloomFilter,
+    DuplicateVote,
+    VoteFilters,
+    get_vote_filters,
+    record_unique_vote,
+)
+from polls.models import Poll, Choice, VoteFingerprint
+
+
+class BloomFilterTest(TestCase):
+
+    def test_no_false_negatives(self):
+        seen = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            seen.add(f'voter {i}')
+        self.assertTrue(all(f'voter {i}' in seen for i in range(1000)))
+
+    def test_false_positive_rate(self):
+        for rate in (0.01, 0.001):
+            seen = BloomFilter(5000, rate)
+            for i in range(5000):
+                seen.add(f'voter {i}')
+            false_positives = sum(
+                f'stranger {i}' in seen for i in range(50000)
+            )
+            self.assertLess(false_positives / 50000, rate * 1.5)
+
+    def test_size_is_bounded_by_capacity(self):
+        seen = BloomFilter(10000, 0.001)
+        # about 1.8 bytes per voter at a 0.1% false positive rate
+        self.assertLess(len(seen.bits), 18000)
+
+
+class VoteFiltersTest(TestCase):
+
+    def test_keeps_most_recent_polls(self):
+        filters = VoteFilters(100, 0.01, max_polls=2)
+        first = filters.get('a')
+        filters.get('b')
+        filters.get('a')
+        filters.get('c')
+        self.assertEqual(list(filters.filters), ['a', 'c'])
+        self.assertIs(filters.get('a'), first)
+
+
+class RecordUniqueVoteTest(TestCase):
+
+    def setUp(self):
+        self.poll = Poll.objects.create(text='A')
+        self.choice = Choice.objects.create(text='1', poll=self.poll)
+
+    def votes(self):
+        return Choice.objects.get(id=self.choice.id).votes
+
+    def test_second_vote_is_rejected(self):
+        record_unique_vote(self.poll.uid, self.choice.id, 'me')
+        with self.assertNumQueries(1):
+            with self.assertRaises(DuplicateVote):
+                record_unique_vote(self.poll.uid, self.choice.id, 'me')
+        record_unique_vote(self.poll.uid, self.choice.id, 'you')
+        self.assertEqual(self.votes(), 2)
+
+    def test_votes_from_before_the_filter_are_rejected(self):
+        VoteFingerprint.objects.create(poll=self.poll, fingerprint='me')
+        with self.assertRaises(DuplicateVote):
+            record_unique_vote(self.poll.uid, self.choice.id, 'me')
+        self.assertEqual(self.votes(), 0)
+
+    def test_false_positives_are_counted(self):
+        get_vote_filters().get(self.poll.uid).add('me')
+        record_unique_vote(self.poll.uid, self.choice.id, 'me')
+        self.assertEqual(self.votes(), 1)
+
+    def test_rejected_choice_is_not_remembered(self):
+        other = Choice.objects.create(
+            text='2', poll=Poll.objects.create(text='B')
+        )
+        with self.assertRaises(Choice.DoesNotExist):
+            record_unique_vote(self.poll.uid, other.id, 'me')
+        self.assertFalse(VoteFingerprint.objects.exists())
+        record_unique_vote(self.poll.uid, self.choice.id, 'me')
+        self.assertEqual(self.votes(), 1)
+
+    def test_votes_per_address_are_limited(self):
+        slots = ['slot 0', 'slot 1']
+        record_unique_vote(self.poll.uid, self.choice.id, 'me', slots)
+        record_unique_vote(self.poll.uid, self.choice.id, 'you', slots)
+        with self.assertRaises(DuplicateVote):
+            record_unique_vote(self.poll.uid, self.choice.id, 'them', slots)
+        self.assertEqual(self.votes(), 2)
+
+    def test_slots_taken_by_other_workers_are_skipped(self):
+        VoteFingerprint.objects.create(poll=self.poll, fingerprint='slot 0')
+        slots = ['slot 0', 'slot 1']
+        record_unique_vote(self.poll.uid, self.choice.id, 'me', slots)
+        self.assertTrue(VoteFingerprint.objects.filter(
+            poll=self.poll, fingerprint='slot 1'
+        ).exists())
+        with self.assertRaises(DuplicateVote):
+            record_unique_vote(self.poll.uid, self.choice.id, 'you', slots)
+        self.assertEqual(self.votes(), 1)
@@ -68,3 +68,39 @@ class NewPollTest(TestCase):
         }
         form = NewPollForm(data=data)
         self.assertEqual(len(form.fields), 6)
+
+    def test_choice_fields_share_a_widget(self):
+        data = {
+            'text': 'question text',
+            'choice_1': 'A',
+            'choice_7': 'B'
+        }
+        form = NewPollForm(data=data)
+        self.assertEqual(form.fields['choice_7'].label, '7')
+        self.assertEqual(form.fields['choice_1'].label, '1')
+        self.assertIs(
+            form.fields['choice_1'].widget, form.fields['choice_7'].widget
+        )
+        self.assertIs(
+            form.fields['choice_1'].widget,
+            NewPollForm().fields['choice_5'].widget
+        )
+
+    def test_shared_choice_widget_is_read_only(self):
+        field = NewPollForm().fields['choice_1']
+        with self.assertRaises(TypeError):
+            field.widget.attrs['class'] = 'is-invalid'
+        with self.assertRaises(TypeError):
+            field.error_messages['max_length'] = 'Too long'
+        with self.assertRaises(AttributeError):
+            field.validators.append(None)
+        self.assertIn('class="form-control"', str(NewPollForm()['choice_1']))
+
+    def test_choice_field_errors(self):
+        form = NewPollForm(data={
+            'text': 'question text',
+            'choice_1': 'A' * 201,
+            'choice_2': 'B'
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('choice_1', form.errors)
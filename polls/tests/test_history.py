@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from polls.buffer import get_vote_buffer
+from polls.history import get_history, roll_up_history
+from polls.models import Poll, Choice, VoteCount, bucket_start
+from polls.votes import record_vote
+
+NOW = datetime(2021, 3, 10, 12, 30, 15, tzinfo=timezone.utc)
+
+
+def at(**delta):
+    return patch('polls.models.timezone.now', return_value=NOW - timedelta(
+        **delta
+    ))
+
+
+class RecordHistoryTest(TestCase):
+
+    def setUp(self):
+        self.poll = Poll.objects.create(text='A')
+        self.choice = Choice.objects.create(text='B', poll=self.poll)
+
+    def test_counts_votes_per_minute(self):
+        with at(seconds=0):
+            record_vote(self.poll.uid, self.choice.id)
+            record_vote(self.poll.uid, self.choice.id)
+        with at(minutes=1):
+            record_vote(self.poll.uid, self.choice.id)
+        self.assertEqual(
+            list(VoteCount.objects.order_by('start').values_list(
+                'resolution', 'start', 'votes'
+            )),
+            [
+                (60, datetime(2021, 3, 10, 12, 29, tzinfo=timezone.utc), 1),
+                (60, datetime(2021, 3, 10, 12, 30, tzinfo=timezone.utc), 2),
+            ]
+        )
+
+    @override_settings(POLLS_VOTE_BUFFER=dict(
+        settings.POLLS_VOTE_BUFFER, ENABLED=True
+    ))
+    def test_counts_buffered_votes(self):
+        record_vote(self.poll.uid, self.choice.id)
+        record_vote(self.poll.uid, self.choice.id)
+        get_vote_buffer().flush()
+        self.assertEqual(VoteCount.objects.get().votes, 2)
+
+    @override_settings(POLLS_VOTE_HISTORY=dict(
+        settings.POLLS_VOTE_HISTORY, ENABLED=False
+    ))
+    def test_disabled(self):
+        record_vote(self.poll.uid, self.choice.id)
+        self.assertFalse(VoteCount.objects.exists())
+
+
+class RollUpHistoryTest(TestCase):
+
+    def setUp(self):
+        self.poll = Poll.objects.create(text='A')
+        self.choice = Choice.objects.create(text='B', poll=self.poll)
+
+    def vote(self, **delta):
+        with at(**delta):
+            record_vote(self.poll.uid, self.choice.id)
+
+    def counts(self):
+        return list(VoteCount.objects.order_by('start').values_list(
+            'resolution', 'start', 'votes'
+        ))
+
+    def test_rolls_old_minutes_into_hours(self):
+        self.vote(days=3, minutes=1)
+        self.vote(days=3, minutes=2)
+        self.vote(days=3, hours=1)
+        self.vote(minutes=1)
+        rolled, expired = roll_up_history(now=NOW, batch_size=1)
+        self.assertEqual((rolled, expired), (3, 0))
+        self.assertEqual(self.counts(), [
+            (3600, datetime(2021, 3, 7, 11, tzinfo=timezone.utc), 1),
+            (3600, datetime(2021, 3, 7, 12, tzinfo=timezone.utc), 2),
+            (60, datetime(2021, 3, 10, 12, 29, tzinfo=timezone.utc), 1),
+        ])
+
+    def test_rolls_old_hours_into_days(self):
+        self.vote(days=100)
+        self.vote(days=100, hours=1)
+        roll_up_history(now=NOW)
+        roll_up_history(now=NOW)
+        self.assertEqual(self.counts(), [
+            (86400, datetime(2020, 11, 30, tzinfo=timezone.utc), 2),
+        ])
+
+    def test_keeps_days_forever_by_default(self):
+        self.vote(days=1000)
+        roll_up_history(now=NOW)
+        roll_up_history(now=NOW)
+        self.assertEqual(VoteCount.objects.get().resolution, VoteCount.DAY)
+
+    def test_expires_old_days(self):
+        self.vote(days=400)
+        self.vote(days=10)
+        with override_settings(POLLS_VOTE_HISTORY=dict(
+            settings.POLLS_VOTE_HISTORY, DAY_RETENTION=60 * 60 * 24 * 365
+        )):
+            self.assertEqual(roll_up_history(now=NOW), (3, 1))
+        self.assertEqual(VoteCount.objects.get().resolution, VoteCount.HOUR)
+
+    def test_history_survives_roll_up(self):
+        self.vote(days=3, minutes=1)
+        self.vote(days=3)
+        since = NOW - timedelta(days=4)
+        before = get_history(self.poll.uid, VoteCount.HOUR, since, NOW)
+        roll_up_history(now=NOW)
+        self.assertEqual(
+            get_history(self.poll.uid, VoteCount.HOUR, since, NOW),
+            before
+        )
+
+
+class GetHistoryTest(TestCase):
+
+    def test_sums_finer_rows(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='B', poll=poll)
+        start = bucket_start(NOW, VoteCount.DAY)
+        VoteCount.objects.add_votes({(poll.uid, choice.id): 5}, 3600, start)
+        VoteCount.objects.add_votes(
+            {(poll.uid, choice.id): 2}, 60, start + timedelta(hours=5)
+        )
+        self.assertEqual(
+            get_history(poll.uid, VoteCount.DAY, start, NOW),
+            [{'start': start, 'votes': {choice.id: 7}}]
+        )
+        # hours are left out of minutes rather than guessed at
+        self.assertEqual(
+            get_history(poll.uid, VoteCount.MINUTE, start, NOW),
+            [{
+                'start': start + timedelta(hours=5),
+                'votes': {choice.id: 2},
+            }]
+        )
@@ -0,0 +1,169 @@
+import asyncio
+import json
+from unittest.mock import patch
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from polls.cache import get_votes
+from polls.live import (
+    InProcessBroker,
+    LiveResults,
+    LiveResultsMiddleware,
+    Subscription,
+)
+from polls.models import Poll, Choice
+from polls.votes import record_vote
+
+
+class SubscriptionTest(TestCase):
+
+    async def test_unread_messages_are_coalesced(self):
+        subscription = Subscription()
+        subscription.put({'votes': {'1': 1, '2': 0}, 'total': 1})
+        subscription.put({'votes': {'2': 3}, 'total': 4})
+
+        message = await subscription.get(1)
+        self.assertEqual(message, {'votes': {'1': 1, '2': 3}, 'total': 4})
+        self.assertIsNone(await subscription.get(0.01))
+
+
+class LiveResultsTest(TestCase):
+
+    def setUp(self):
+        self.poll = Poll.objects.create(text='Would you like a cookie?')
+        self.yes = Choice.objects.create(text='Yes', poll=self.poll)
+        self.no = Choice.objects.create(text='No', poll=self.poll)
+        self.live = LiveResults(InProcessBroker(), 60)
+
+    async def stop_tickers(self):
+        for ticker in list(self.live.tickers.values()):
+            ticker.cancel()
+            await asyncio.gather(ticker, return_exceptions=True)
+
+    async def test_one_count_per_tick_for_every_watcher(self):
+        with patch('polls.live.get_votes', wraps=get_votes) as counts:
+            first = await self.live.subscribe(self.poll.uid)
+            second = await self.live.subscribe(self.poll.uid)
+            for subscription in (first, second):
+                message = await subscription.get(1)
+                self.assertEqual(message['total'], 0)
+        self.assertEqual(counts.call_count, 1)
+        await self.stop_tickers()
+
+    async def test_only_changed_counts_are_published(self):
+        subscription = await self.live.subscribe(self.poll.uid)
+        message = await subscription.get(1)
+        self.assertEqual(
+            message['votes'], {str(self.yes.id): 0, str(self.no.id): 0}
+        )
+
+        await sync_to_async(record_vote)(self.poll.uid, self.yes.id)
+        await self.live.tick(self.poll.uid, self.poll.id)
+        message = await subscription.get(1)
+        self.assertEqual(message['votes'], {str(self.yes.id): 1})
+        self.assertEqual(message['total'], 1)
+
+        await self.live.tick(self.poll.uid, self.poll.id)
+        self.assertIsNone(await subscription.get(0.01))
+        await self.stop_tickers()
+
+    async def test_late_subscribers_get_every_count(self):
+        first = await self.live.subscribe(self.poll.uid)
+        await first.get(1)
+        await sync_to_async(record_vote)(self.poll.uid, self.no.id)
+        await self.live.tick(self.poll.uid, self.poll.id)
+
+        second = await self.live.subscribe(self.poll.uid)
+        message = await second.get(1)
+        self.assertEqual(
+            message['votes'], {str(self.yes.id): 0, str(self.no.id): 1}
+        )
+        await self.stop_tickers()
+
+    async def test_ticker_stops_without_subscribers(self):
+        self.live.tick_seconds = 0.01
+        subscription = await self.live.subscribe(self.poll.uid)
+        ticker = self.live.tickers[self.poll.uid]
+        self.live.unsubscribe(self.poll.uid, subscription)
+        await asyncio.wait_for(ticker, 1)
+        self.assertEqual(self.live.tickers, {})
+
+    async def test_ticker_keeps_going_after_errors(self):
+        self.live.tick_seconds = 0.01
+        counts = [ValueError, {self.yes.id: 2}]
+        with patch('polls.live.get_votes', side_effect=counts):
+            with self.assertLogs('polls.live', 'ERROR'):
+                subscription = await self.live.subscribe(self.poll.uid)
+                message = await subscription.get(1)
+        self.assertEqual(message['total'], 2)
+        self.assertIn(self.poll.uid, self.live.tickers)
+        await self.stop_tickers()
+
+    async def test_unknown_poll(self):
+        self.assertIsNone(await self.live.subscribe('missing'))
+
+
+@override_settings(POLLS_LIVE_RESULTS={
+    'ENABLED': True,
+    'BROKER': 'polls.live.InProcessBroker',
+    'TICK': 0.01,
+    'KEEPALIVE': 15,
+})
+class LiveResultsMiddlewareTest(TestCase):
+
+    def setUp(self):
+        self.poll = Poll.objects.create(text='Would you like a cookie?')
+        self.choice = Choice.objects.create(text='Yes', poll=self.poll)
+
+    async def request(self, path, events=0):
+        sent = []
+        done = asyncio.Event()
+
+        async def app(scope, receive, send):
+            sent.append({'type': 'django'})
+
+        async def receive():
+            await done.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+            if len(sent) > events:
+                done.set()
+
+        scope = {'type': 'http', 'method': 'GET', 'path': path}
+        await asyncio.wait_for(
+            LiveResultsMiddleware(app)(scope, receive, send), 5
+        )
+        return sent
+
+    async def test_streams_results(self):
+        sent = await self.request(f'/poll/{self.poll.uid}/results/live', 1)
+
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn(
+            (b'content-type', b'text/event-stream'), sent[0]['headers']
+        )
+        event, data = sent[1]['body'].decode().split('\n')[:2]
+        self.assertEqual(event, 'event: results')
+        message = json.loads(data[len('data: '):])
+        self.assertEqual(message['votes'], {str(self.choice.id): 0})
+        self.assertTrue(message['chart'].startswith(
+            f'/poll/{self.poll.uid}/results/chart.svg?v='
+        ))
+
+    async def test_unknown_poll(self):
+        sent = await self.request('/poll/missing/results/live')
+        self.assertEqual(sent[0]['status'], 404)
+
+    async def test_other_requests_reach_django(self):
+        sent = await self.request(f'/poll/{self.poll.uid}/results')
+        self.assertEqual(sent, [{'type': 'django'}])
+
+    def test_results_page_links_the_stream(self):
+        response = self.client.get(f'/poll/{self.poll.uid}/results')
+        self.assertContains(response, f'/poll/{self.poll.uid}/results/live')
+
+    @override_settings(POLLS_LIVE_RESULTS={'ENABLED': False})
+    def test_results_page_without_live_results(self):
+        response = self.client.get(f'/poll/{self.poll.uid}/results')
+        self.assertNotContains(response, 'EventSource')
@@ -1,5 +1,7 @@
 from django.test import TestCase
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from unittest.mock import patch
 from polls.models import Poll, Choice, short_urltoken
 
 from datetime import datetime, timedelta, timezone
@@ -27,6 +29,66 @@ class PollModelTest(TestCase):
             datetime.now(timezone.utc) - poll.pub_date < timedelta(seconds=0.2)
         )
 
+    def test_uid_is_unique(self):
+        poll = Poll.objects.create(text='text')
+        with self.assertRaises(IntegrityError):
+            Poll.objects.create(text='text', uid=poll.uid)
+
+    def test_create_unique_retries_on_collision(self):
+        existing = Poll.objects.create(text='text')
+        with patch(
+            'polls.models.short_urltoken',
+            side_effect=[existing.uid, existing.uid, 'fresh-uid']
+        ):
+            poll = Poll.objects.create_unique(text='new')
+        self.assertEqual(poll.uid, 'fresh-uid')
+        self.assertEqual(Poll.objects.get(uid='fresh-uid').text, 'new')
+
+    def test_create_unique_gives_up(self):
+        existing = Poll.objects.create(text='text')
+        with patch(
+            'polls.models.short_urltoken',
+            return_value=existing.uid
+        ):
+            with self.assertRaises(IntegrityError):
+                Poll.objects.create_unique(text='new')
+        self.assertEqual(Poll.objects.count(), 1)
+
+    def test_bulk_create_unique_sets_ids(self):
+        polls = Poll.objects.bulk_create_unique(
+            [Poll(text='A'), Poll(text='B')]
+        )
+        self.assertEqual(
+            [Poll.objects.get(id=poll.id).uid for poll in polls],
+            [poll.uid for poll in polls]
+        )
+
+    def test_bulk_create_unique_retries_on_collision(self):
+        existing = Poll.objects.create(text='text')
+        with patch(
+            'polls.models.short_urltoken',
+            side_effect=[existing.uid, 'fresh-a', 'fresh-b', 'fresh-c']
+        ):
+            polls = Poll.objects.bulk_create_unique(
+                [Poll(text='A'), Poll(text='B')]
+            )
+        self.assertEqual([poll.uid for poll in polls], ['fresh-b', 'fresh-c'])
+        self.assertEqual(Poll.objects.count(), 3)
+
+    def test_total_votes_start_at_zero(self):
+        poll = Poll.objects.create(text='text')
+        self.assertEqual(poll.total_votes, 0)
+
+    def test_recount_votes(self):
+        poll = Poll.objects.create(text='text', total_votes=100)
+        Choice.objects.create(poll=poll, text='A', votes=3)
+        Choice.objects.create(poll=poll, text='B', votes=4)
+        empty_poll = Poll.objects.create(text='text', total_votes=5)
+        Poll.objects.recount_votes()
+        self.assertEqual(Poll.objects.get(id=poll.id).total_votes, 7)
+        self.assertEqual(Poll.objects.get(id=empty_poll.id).total_votes, 0)
+        self.assertEqual(Poll.objects.get(id=poll.id).version, 1)
+
 
 class ChoiceModelTest(TestCase):
 
@@ -51,6 +113,16 @@ class ChoiceModelTest(TestCase):
         choice = Choice.objects.create(poll=poll, text='text')
         self.assertEqual(choice.votes, 0)
 
+    def test_add_votes(self):
+        poll = Poll.objects.create(text='text')
+        choice_a = Choice.objects.create(poll=poll, text='A')
+        choice_b = Choice.objects.create(poll=poll, text='B', votes=1)
+        Choice.objects.add_votes({choice_a.id: 2, choice_b.id: 3})
+        self.assertEqual(Choice.objects.get(id=choice_a.id).votes, 2)
+        self.assertEqual(Choice.objects.get(id=choice_b.id).votes, 4)
+        self.assertEqual(Poll.objects.get(id=poll.id).total_votes, 5)
+        self.assertEqual(Poll.objects.get(id=poll.id).version, 1)
+
     def test_choice_order_is_preserved(self):
         poll = Poll.objects.create(text='text')
         choices = [
@@ -0,0 +1,115 @@
+import threading
+from django.test import SimpleTestCase
+from unittest.mock import patch
+from polls.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class FakeConnection:
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.usable = True
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+def reset(connection):
+    if connection.closed:
+        raise ValueError('closed')
+    connection.in_transaction = False
+
+
+class ConnectionPoolTest(SimpleTestCase):
+
+    def setUp(self):
+        self.pool = ConnectionPool(
+            lambda connection: connection.usable,
+            reset,
+            max_size=2,
+            timeout=0.01,
+            check_after=30
+        )
+        self.opened = []
+
+    def connect(self):
+        connection = FakeConnection(len(self.opened))
+        self.opened.append(connection)
+        return connection
+
+    def test_reuses_returned_connections(self):
+        first = self.pool.get(self.connect)
+        self.pool.put(first)
+        self.assertIs(self.pool.get(self.connect), first)
+        self.assertEqual(self.pool.opened, 1)
+
+    def test_hands_out_most_recently_used(self):
+        first = self.pool.get(self.connect)
+        second = self.pool.get(self.connect)
+        self.pool.put(first)
+        self.pool.put(second)
+        self.assertIs(self.pool.get(self.connect), second)
+
+    def test_waits_for_a_free_connection(self):
+        first = self.pool.get(self.connect)
+        self.pool.get(self.connect)
+        with self.assertRaises(PoolTimeout):
+            self.pool.get(self.connect)
+
+        timer = threading.Timer(0.001, self.pool.put, (first,))
+        self.pool.timeout = 1
+        timer.start()
+        self.assertIs(self.pool.get(self.connect), first)
+        timer.join()
+
+    def test_failed_connect_frees_its_slot(self):
+        def fail():
+            raise OSError('refused')
+
+        for _ in range(3):
+            with self.assertRaises(OSError):
+                self.pool.get(fail)
+        self.assertIsNotNone(self.pool.get(self.connect))
+
+    def test_resets_returned_connections(self):
+        connection = self.pool.get(self.connect)
+        connection.in_transaction = True
+        self.pool.put(connection)
+        self.assertFalse(self.pool.get(self.connect).in_transaction)
+
+    def test_discards_broken_connections(self):
+        connection = self.pool.get(self.connect)
+        connection.closed = True
+        self.pool.put(connection)
+        self.assertIsNot(self.pool.get(self.connect), connection)
+        self.assertEqual(self.pool.opened, 2)
+
+    def test_checks_idle_connections(self):
+        connection = self.pool.get(self.connect)
+        self.pool.put(connection)
+        connection.usable = False
+        # recently returned connections are trusted
+        self.assertIs(self.pool.get(self.connect), connection)
+        self.pool.put(connection)
+        with patch('polls.db.pool.time.monotonic', return_value=10 ** 9):
+            replacement = self.pool.get(self.connect)
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+
+    def test_close_closes_idle_connections(self):
+        connection = self.pool.get(self.connect)
+        self.pool.put(connection)
+        self.pool.close()
+        self.assertTrue(connection.closed)
+
+
+class GetPoolTest(SimpleTestCase):
+
+    def test_pool_per_process_and_alias(self):
+        first = get_pool('test', object)
+        self.assertIs(get_pool('test', object), first)
+        self.assertIsNot(get_pool('other', object), first)
+        with patch('polls.db.pool.os.getpid', return_value=-1):
+            self.assertIsNot(get_pool('test', object), first)
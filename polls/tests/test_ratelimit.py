@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory, override_settings
+from polls.models import Poll, Choice
+from polls.ratelimit import TokenBucket, client_address
+
+RATE_LIMITS = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'RULES': {
+        'vote': {
+            'VIEWS': ['poll'],
+            'METHODS': ['POST'],
+            'RATE': 0.001,
+            'BURST': 2,
+        },
+    },
+}
+
+
+class TokenBucketTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_allows_bursts(self):
+        bucket = TokenBucket(cache, rate=1, burst=3)
+        waits = [bucket.take('client', now=100) for _ in range(4)]
+        self.assertEqual(waits, [0, 0, 0, 1])
+
+    def test_refills_at_rate(self):
+        bucket = TokenBucket(cache, rate=2, burst=1)
+        self.assertEqual(bucket.take('client', now=100), 0)
+        self.assertEqual(bucket.take('client', now=100.25), 0.25)
+        self.assertEqual(bucket.take('client', now=100.5), 0)
+
+    def test_clients_have_their_own_buckets(self):
+        bucket = TokenBucket(cache, rate=1, burst=1)
+        self.assertEqual(bucket.take('first', now=100), 0)
+        self.assertEqual(bucket.take('second', now=100), 0)
+
+
+class ClientAddressTest(TestCase):
+
+    def test_remote_addr(self):
+        request = RequestFactory().get(
+            '/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4'
+        )
+        self.assertEqual(client_address(request), '10.0.0.1')
+
+    @override_settings(POLLS_TRUSTED_PROXIES=1)
+    def test_trusted_proxy(self):
+        request = RequestFactory().get(
+            '/',
+            REMOTE_ADDR='10.0.0.1',
+            HTTP_X_FORWARDED_FOR='6.6.6.6, 1.2.3.4'
+        )
+        self.assertEqual(client_address(request), '1.2.3.4')
+
+
+@override_settings(POLLS_RATE_LIMITS=RATE_LIMITS)
+class RateLimitMiddlewareTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(text='A')
+        self.choice = Choice.objects.create(text='1', poll=self.poll)
+        self.url = f'/poll/{self.poll.uid}'
+
+    def vote(self, **extra):
+        return self.client.post(
+            self.url, data={'choice_id': self.choice.id}, **extra
+        )
+
+    def test_rejects_before_any_query(self):
+        self.vote()
+        self.vote()
+        with self.assertNumQueries(0):
+            response = self.vote()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1000')
+
+    def test_limits_only_matching_methods(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_limits_each_client(self):
+        self.vote()
+        self.vote()
+        response = self.vote(REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(POLLS_RATE_LIMITS=dict(RATE_LIMITS, ENABLED=False))
+    def test_disabled(self):
+        for _ in range(3):
+            self.assertEqual(self.vote().status_code, 302)
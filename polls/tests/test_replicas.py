@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.db import router
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, override_settings
+from django.urls import resolve
+from polls.models import Poll, Choice
+from polls.replicas import PIN_COOKIE, ReplicaMiddleware
+
+READ_REPLICAS = dict(settings.POLLS_READ_REPLICAS, ALIASES=['replica1'])
+
+
+@override_settings(POLLS_READ_REPLICAS=READ_REPLICAS)
+class ReplicaMiddlewareTest(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.used = []
+
+    def call(self, request, status=200):
+        request.resolver_match = resolve(request.path)
+
+        def get_response(request):
+            # process_view runs from inside the rest of the middleware
+            self.assertIsNone(middleware.process_view(request, None, (), {}))
+            self.used.append(Poll.objects.all().db)
+            self.written = router.db_for_write(Poll)
+            return HttpResponse(status=status)
+
+        middleware = ReplicaMiddleware(get_response)
+        return middleware(request)
+
+    def test_reads_from_replica(self):
+        self.call(self.factory.get('/poll/abc'))
+        self.assertEqual(self.used, ['replica1'])
+        # only for the length of the request
+        self.assertEqual(Poll.objects.all().db, 'default')
+
+    def test_writes_go_to_primary(self):
+        self.call(self.factory.get('/poll/abc'))
+        self.assertEqual(self.written, 'default')
+
+    def test_other_views_read_from_primary(self):
+        self.call(self.factory.get('/api/v1/polls/bulk'))
+        self.assertEqual(self.used, ['default'])
+
+    def test_changes_read_from_primary(self):
+        response = self.call(self.factory.post('/poll/abc'), status=302)
+        self.assertEqual(self.used, ['default'])
+        self.assertEqual(
+            response.cookies[PIN_COOKIE]['max-age'],
+            READ_REPLICAS['PIN_SECONDS']
+        )
+
+    def test_failed_changes_do_not_pin(self):
+        response = self.call(self.factory.post('/poll/abc'), status=404)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_pinned_client_reads_from_primary(self):
+        request = self.factory.get('/poll/abc')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.call(request)
+        self.assertEqual(self.used, ['default'])
+
+    def test_no_replicas(self):
+        with override_settings(POLLS_READ_REPLICAS=dict(
+            READ_REPLICAS, ALIASES=[]
+        )):
+            response = self.call(self.factory.post('/poll/abc'), status=302)
+            self.call(self.factory.get('/poll/abc'))
+        self.assertEqual(self.used, ['default', 'default'])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+@override_settings(POLLS_READ_REPLICAS=READ_REPLICAS)
+class ReadYourWritesTest(TestCase):
+
+    def test_voter_reads_results_from_primary(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='B', poll=poll)
+        response = self.client.post(
+            f'/poll/{poll.uid}', {'choice_id': choice.id}, follow=True
+        )
+        self.assertContains(response, 'B')
+        self.assertIn(PIN_COOKIE, self.client.cookies)
@@ -1,4 +1,6 @@
 from collections import OrderedDict
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from polls.models import Poll, Choice
 from polls.serializers import PollSerializer, ChoiceSerializer
@@ -50,6 +52,36 @@ class PollAPITest(APITestCase):
         self.assertEqual(choice.poll, poll)
         self.assertEqual(choice.text, 'Choice A')
 
+    def test_creates_choices_in_one_query(self):
+        serializer = PollSerializer(data={
+            'text': 'My nested poll',
+            'choices': [{'text': 'A'}, {'text': 'B'}, {'text': 'C'}]
+        })
+        self.assertTrue(serializer.is_valid())
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save()
+        inserts = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('INSERT INTO "polls_choice"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Choice.objects.count(), 3)
+
+    def test_can_create_many_polls(self):
+        serializer = PollSerializer(many=True, data=[
+            {'text': 'First', 'choices': [{'text': 'A'}, {'text': 'B'}]},
+            {'text': 'Second', 'choices': [{'text': 'C'}, {'text': 'D'}]},
+        ])
+        self.assertTrue(serializer.is_valid())
+        polls = serializer.save()
+
+        self.assertEqual([poll.text for poll in polls], ['First', 'Second'])
+        self.assertEqual(
+            [c.text for c in Choice.objects.filter(poll=polls[1])],
+            ['C', 'D']
+        )
+        self.assertEqual(len({poll.uid for poll in polls}), 2)
+
     def test_invalid_poll_with_no_choices(self):
         serializer = PollSerializer(data={'text': 'My poll text'})
         self.assertFalse(serializer.is_valid())
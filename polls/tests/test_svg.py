@@ -0,0 +1,73 @@
+from xml.etree import ElementTree
+from django.conf import settings
+from django.test import TestCase, override_settings
+from polls.charts import render_chart
+from polls.models import Poll, Choice
+from polls.svg import render_pie
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def parse(svg):
+    return ElementTree.fromstring(svg)
+
+
+class RenderPieTest(TestCase):
+
+    def test_slice_per_choice_with_votes(self):
+        chart = parse(render_pie([
+            ('Yes', 3, '#f75f5f'),
+            ('No', 1, '#4fef44'),
+            ('Eh', 0, '#44efe5'),
+        ]))
+        slices = chart.findall(f'{SVG}path')
+        self.assertEqual(
+            [(s.get('fill'), s.find(f'{SVG}title').text) for s in slices],
+            [('#f75f5f', 'Yes: 3'), ('#4fef44', 'No: 1')]
+        )
+        # where pygal draws it, clockwise from the top
+        self.assertEqual(
+            slices[0].get('d'),
+            'M423.60 300.00 L423.60 48.00 '
+            'A252.00 252.00 0 1 1 171.60 300.00z'
+        )
+        legends = [text.text for text in chart.iter(f'{SVG}text')]
+        self.assertEqual(legends, ['Yes', 'No', 'Eh'])
+
+    def test_single_choice_is_a_circle(self):
+        chart = parse(render_pie([('Yes', 3, '#f75f5f'), ('No', 0, '#000')]))
+        self.assertEqual(len(chart.findall(f'{SVG}circle')), 1)
+        self.assertEqual(chart.findall(f'{SVG}path'), [])
+
+    def test_no_votes(self):
+        chart = parse(render_pie([('Yes', 0, '#f75f5f')]))
+        self.assertEqual(chart.find(f'{SVG}text').text, 'No data')
+        self.assertEqual(chart.findall(f'{SVG}path'), [])
+
+    def test_escapes_text(self):
+        chart = parse(render_pie([('<b>&', 1, '#f75f5f')]))
+        self.assertEqual(chart.find(f'{SVG}circle/{SVG}title').text, '<b>&: 1')
+
+    def test_shortens_long_legends(self):
+        chart = parse(render_pie([('A much longer choice', 1, '#f75f5f')]))
+        self.assertEqual(
+            chart.findall(f'{SVG}text')[-1].text, 'A much longer …'
+        )
+
+
+class RenderChartTest(TestCase):
+
+    def setUp(self):
+        poll = Poll.objects.create(text='A')
+        Choice.objects.create(poll=poll, text='Yes', votes=2)
+        self.choices = list(Choice.objects.with_votes())
+
+    def test_svg_renderer(self):
+        chart = parse(render_chart(self.choices))
+        self.assertEqual(chart.find(f'{SVG}circle').get('fill'), '#f75f5f')
+
+    @override_settings(POLLS_RESULTS_CHART=dict(
+        settings.POLLS_RESULTS_CHART, RENDERER='pygal'
+    ))
+    def test_pygal_renderer(self):
+        self.assertIn(b'pygal-chart', render_chart(self.choices))
@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from polls.models import Poll, Choice
+
+
+class RequestTimingTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(text='Would you like a cookie?')
+        Choice.objects.create(text='Yes', poll=self.poll, votes=2)
+        Choice.objects.create(text='No', poll=self.poll, votes=1)
+
+    def test_server_timing_header(self):
+        response = self.client.get(f'/poll/{self.poll.uid}/results')
+
+        timings = response['Server-Timing'].split(', ')
+        self.assertTrue(timings[0].startswith('db;desc="2 queries";dur='))
+        self.assertEqual(
+            sorted(timing.split(';')[0] for timing in timings),
+            ['db', 'template', 'total']
+        )
+        self.assertEqual(response.timings.queries, 2)
+
+    def test_chart_render_time(self):
+        response = self.client.get(
+            f'/poll/{self.poll.uid}/results/chart.svg'
+        )
+        self.assertIn('chart', response.timings.seconds)
+
+    def test_logs_timings(self):
+        with self.assertLogs('polls.timing', 'INFO') as logs:
+            self.client.get(f'/poll/{self.poll.uid}/results')
+
+        self.assertTrue(logs.output[0].startswith(
+            'INFO:polls.timing:view=results method=GET status=200 queries=2 '
+        ))
+        fields = logs.records[0].timings
+        self.assertEqual(fields['view'], 'results')
+        self.assertIn('template_ms', fields)
+
+    @override_settings(POLLS_REQUEST_TIMING={'HEADER': False, 'LOG': False})
+    def test_disabled(self):
+        response = self.client.get(f'/poll/{self.poll.uid}/results')
+        self.assertNotIn('Server-Timing', response)
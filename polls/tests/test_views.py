@@ -1,10 +1,18 @@
 from collections import OrderedDict
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from unittest.mock import patch
 from rest_framework import status
 from polls.models import Poll, Choice
+from polls.dedup import new_voter_cookie
 from polls.forms import NewPollForm
+from polls.votes import record_vote
+from polls.tests.helpers import QueryBudgetMixin
 import json
+from datetime import datetime, timezone
 
 
 class HomeGetTest(TestCase):
@@ -17,6 +25,14 @@ class HomeGetTest(TestCase):
         response = self.client.get('/')
         self.assertIsInstance(response.context['form'], NewPollForm)
 
+    def test_blank_form_is_rendered_once(self):
+        cache.clear()
+        response = self.client.get('/')
+        self.assertTemplateUsed(response, 'new_poll_fields.html')
+        response = self.client.get('/')
+        self.assertTemplateNotUsed(response, 'new_poll_fields.html')
+        self.assertContains(response, 'name="choice_5"')
+
     def test_compare_popular_polls(self):
         polls = []
         for i in range(10):
@@ -26,10 +42,19 @@ class HomeGetTest(TestCase):
                 choice.votes = (12 - i) * 5  # we want i=0 to be the highest
                 choice.save()
             polls.append(new_poll)
+        Poll.objects.recount_votes()
         response = self.client.get('/')
         response_popular = list(response.context['popular'])
         self.assertListEqual(response_popular, polls)
 
+    def test_popular_polls_read_total_votes(self):
+        for i in range(3):
+            Poll.objects.create(text=f'Question {i}', total_votes=i)
+        response = self.client.get('/')
+        popular = response.context['popular']
+        self.assertNotIn('JOIN', str(popular.query))
+        self.assertEqual([p.total_votes for p in popular], [2, 1, 0])
+
 
 class HomePostTest(TestCase):
 
@@ -103,6 +128,87 @@ class ViewPollGetTest(TestCase):
         self.assertEqual(response.context['poll'], poll)
 
 
+class ViewPollCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(text='Would you like a cookie?')
+        Choice.objects.create(text='Yes', poll=self.poll)
+        Choice.objects.create(text='No', poll=self.poll)
+        self.url = f'/poll/{self.poll.uid}'
+
+    def test_cached_poll_needs_no_queries(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Would you like a cookie?')
+        self.assertContains(response, 'name="choice_label">No<')
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_304_keeps_the_csrf_cookie(self):
+        client = Client(enforce_csrf_checks=True)
+        etag = client.get(self.url)['ETag']
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('csrftoken', response.cookies)
+
+    def test_cached_page_can_vote_without_cookies(self):
+        client = Client(enforce_csrf_checks=True)
+        etag = client.get(self.url)['ETag']
+        client.cookies.clear()
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = client.post(self.url, {
+            'choice_id': self.poll.choices.first().id,
+            'csrfmiddlewaretoken': response.context['csrf_token'],
+        })
+        self.assertEqual(response.status_code, 302)
+
+    def test_is_privately_cacheable(self):
+        response = self.client.get(self.url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_unknown_poll_returns_404(self):
+        response = self.client.get('/poll/missing')
+        self.assertEqual(response.status_code, 404)
+
+    def test_sets_voter_cookie_once(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.cookies['voter'].value)
+        response = self.client.get(self.url)
+        self.assertNotIn('voter', response.cookies)
+
+    def test_choices_are_rendered_once(self):
+        self.client.get(self.url)
+        # only the serialized poll is dropped, the rendered choices stay
+        cache.delete(f'polls:poll:{self.poll.uid}')
+        Choice.objects.filter(text='No').update(text='Nope')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'name="choice_label">No<')
+
+    def test_share_links_follow_the_scheme(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, secure=True)
+        self.assertContains(response, f'value="https://testserver{self.url}"')
+
+    @override_settings(POLLS_POLL_CACHE=dict(
+        settings.POLLS_POLL_CACHE, FRAGMENT_TIMEOUT=0
+    ))
+    def test_fragment_caching_off(self):
+        self.client.get(self.url)
+        cache.delete(f'polls:poll:{self.poll.uid}')
+        Choice.objects.filter(text='No').update(text='Nope')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'name="choice_label">Nope<')
+
+
 class PollPostTest(TestCase):
 
     def test_redirects_to_results_page(self):
@@ -134,6 +240,84 @@ class PollPostTest(TestCase):
         })
         self.assertEqual(Choice.objects.get(id=choice.id).votes, 2)
 
+    def test_choice_from_another_poll_returns_404(self):
+        poll = Poll.objects.create(text='A')
+        other_poll = Poll.objects.create(text='B')
+        choice = Choice.objects.create(text='123', poll=other_poll)
+        response = self.client.post(f'/poll/{poll.uid}', data={
+            'choice_id': choice.id
+        })
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 0)
+
+    def test_invalid_choice_id_returns_404(self):
+        poll = Poll.objects.create(text='A')
+        response = self.client.post(f'/poll/{poll.uid}', data={
+            'choice_id': 'not a number'
+        })
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_choice_id_returns_404(self):
+        poll = Poll.objects.create(text='A')
+        response = self.client.post(f'/poll/{poll.uid}')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(POLLS_VOTE_DEDUP=dict(
+    settings.POLLS_VOTE_DEDUP, ENABLED=True, VOTES_PER_ADDRESS=3
+))
+class DuplicateVoteTest(TestCase):
+
+    def test_second_vote_is_not_counted(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        self.client.get(f'/poll/{poll.uid}')
+        for _ in range(2):
+            response = self.client.post(f'/poll/{poll.uid}', data={
+                'choice_id': choice.id
+            }, follow=True)
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 1)
+        self.assertContains(response, 'You have already voted on this poll')
+
+    def test_voters_are_told_apart_by_cookie(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        for _ in range(2):
+            self.client.cookies['voter'] = new_voter_cookie()
+            self.client.post(f'/poll/{poll.uid}', data={
+                'choice_id': choice.id
+            })
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 2)
+
+    def test_made_up_cookies_do_not_vote_again(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        for voter in ('first', 'second', new_voter_cookie() + 'x'):
+            self.client.cookies['voter'] = voter
+            self.client.post(f'/poll/{poll.uid}', data={
+                'choice_id': choice.id
+            })
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 1)
+
+    def test_fresh_cookies_only_vote_a_few_times(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        for _ in range(5):
+            self.client.cookies.clear()
+            self.client.get(f'/poll/{poll.uid}')
+            response = self.client.post(f'/poll/{poll.uid}', data={
+                'choice_id': choice.id
+            }, follow=True)
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 3)
+        self.assertContains(response, 'You have already voted on this poll')
+
+        self.client.cookies.clear()
+        self.client.get(f'/poll/{poll.uid}', REMOTE_ADDR='10.0.0.2')
+        self.client.post(f'/poll/{poll.uid}', data={
+            'choice_id': choice.id
+        }, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 4)
+
 
 class ResultsTest(TestCase):
 
@@ -153,30 +337,33 @@ class ResultsTest(TestCase):
         response = self.client.get(f'/poll/{poll.uid}/results')
         self.assertIsNotNone(response.context['chart'])
 
-    @patch('polls.views.Pie')
-    def test_pie_chart_from_poll(self, mock_pie):
+    def test_chart_links_to_chart_view(self):
         poll = Poll.objects.create(text='The question we are asking')
-        for i in range(5):
-            choice = Choice.objects.create(text=str(i), poll=poll)
-            choice.votes = i
-            choice.save()
-        self.client.get(f'/poll/{poll.uid}/results')
-        mock_pie.assert_called()
-        for i in range(5):
-            mock_pie().add.called_with('0', 0)
+        response = self.client.get(f'/poll/{poll.uid}/results')
+        self.assertTrue(
+            response.context['chart'].startswith(
+                f'/poll/{poll.uid}/results/chart.svg?v='
+            )
+        )
 
-    @patch('polls.views.Pie')
-    def test_response_chart_matches_render(self, mock_pie):
+    def test_chart_link_changes_with_votes(self):
         poll = Poll.objects.create(text='The question we are asking')
-        for i in range(5):
-            choice = Choice.objects.create(text=str(i), poll=poll)
-            choice.votes = i
-            choice.save()
+        choice = Choice.objects.create(text='A', poll=poll)
+        before = self.client.get(f'/poll/{poll.uid}/results')
+        record_vote(poll.uid, choice.id)
+        after = self.client.get(f'/poll/{poll.uid}/results')
+        self.assertNotEqual(before.context['chart'], after.context['chart'])
+
+    def test_results_are_cached_until_the_next_vote(self):
+        poll = Poll.objects.create(text='The question we are asking')
+        choice = Choice.objects.create(text='A', poll=poll)
+        self.client.get(f'/poll/{poll.uid}/results')
+        with self.assertNumQueries(1):
+            self.client.get(f'/poll/{poll.uid}/results')
+
+        record_vote(poll.uid, choice.id)
         response = self.client.get(f'/poll/{poll.uid}/results')
-        self.assertEqual(
-            response.context['chart'],
-            mock_pie().render_data_uri.return_value
-        )
+        self.assertEqual(response.context['poll'].total_votes, 1)
 
     def test_passes_custom_choices(self):
         poll = Poll.objects.create(text='The question we are asking')
@@ -217,6 +404,75 @@ class ResultsTest(TestCase):
         self.assertEqual(response.context['poll'].total_votes, 10)
 
 
+@override_settings(POLLS_RESULTS_CHART=dict(
+    settings.POLLS_RESULTS_CHART, RENDERER='pygal'
+))
+class ResultsChartTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(text='The question we are asking')
+        self.choices = [
+            Choice.objects.create(text=str(i), poll=self.poll, votes=i)
+            for i in range(5)
+        ]
+        self.url = f'/poll/{self.poll.uid}/results/chart.svg'
+
+    @patch('pygal.Pie')
+    def test_pie_chart_from_poll(self, mock_pie):
+        mock_pie.return_value.render.return_value = b'<svg></svg>'
+        self.client.get(self.url)
+        mock_pie.assert_called()
+        for i in range(5):
+            mock_pie().add.assert_any_call(str(i), i)
+
+    @patch('pygal.Pie')
+    def test_response_chart_matches_render(self, mock_pie):
+        mock_pie.return_value.render.return_value = b'<svg></svg>'
+        response = self.client.get(self.url)
+        self.assertEqual(response.content, b'<svg></svg>')
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+
+    def test_unknown_poll_returns_404(self):
+        response = self.client.get('/poll/missing/results/chart.svg')
+        self.assertEqual(response.status_code, 404)
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_is_cacheable(self):
+        response = self.client.get(self.url)
+        self.assertIn('public', response['Cache-Control'])
+
+    @patch('pygal.Pie')
+    def test_chart_is_only_rendered_once(self, mock_pie):
+        mock_pie.return_value.render.return_value = b'<svg></svg>'
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(mock_pie.call_count, 1)
+
+    @override_settings(POLLS_RESULTS_CHART=dict(
+        settings.POLLS_RESULTS_CHART, STALE_SECONDS=0, TIMEOUT=60
+    ))
+    def test_new_votes_render_new_chart(self):
+        etag = self.client.get(self.url)['ETag']
+        record_vote(self.poll.uid, self.choices[0].id)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(POLLS_RESULTS_CHART=dict(
+        settings.POLLS_RESULTS_CHART, STALE_SECONDS=60, TIMEOUT=60
+    ))
+    def test_stale_chart_is_served_within_window(self):
+        etag = self.client.get(self.url)['ETag']
+        record_vote(self.poll.uid, self.choices[0].id)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
 class PollsListAPITest(TestCase):
 
     def test_can_create_poll(self):
@@ -259,7 +515,8 @@ class PollsListAPITest(TestCase):
         choice_3 = Choice.objects.create(text='Fourth', poll=poll_1, votes=8)
 
         response = self.client.get(f'/api/v1/polls')
-        self.assertEqual(response.data, [
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(response.data['results'], [
             OrderedDict(
                 id=poll_0.id,
                 uid=poll_0.uid,
@@ -299,6 +556,174 @@ class PollsListAPITest(TestCase):
         ])
 
 
+class PollsListAPIPageTest(TestCase):
+
+    def setUp(self):
+        self.polls = []
+        for i in range(5):
+            poll = Poll.objects.create(text=f'Poll {i}', total_votes=i)
+            Choice.objects.create(text='A', poll=poll)
+            Choice.objects.create(text='B', poll=poll)
+            self.polls.append(poll)
+
+    def ids(self, response):
+        return [poll['id'] for poll in response.data['results']]
+
+    def test_limit_pages_results(self):
+        response = self.client.get('/api/v1/polls?limit=2')
+        self.assertEqual(self.ids(response), [p.id for p in self.polls[:2]])
+        self.assertIn(f'cursor={self.polls[1].id}', response.data['next'])
+
+    def test_next_continues_after_cursor(self):
+        response = self.client.get('/api/v1/polls?limit=2')
+        response = self.client.get(response.data['next'])
+        self.assertEqual(self.ids(response), [p.id for p in self.polls[2:4]])
+
+    def test_last_page_has_no_next(self):
+        response = self.client.get(
+            f'/api/v1/polls?limit=2&cursor={self.polls[2].id}'
+        )
+        self.assertEqual(self.ids(response), [p.id for p in self.polls[3:]])
+        self.assertIsNone(response.data['next'])
+
+    def test_query_count_does_not_grow_with_polls(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/polls')
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_filter_min_votes(self):
+        response = self.client.get('/api/v1/polls?min_votes=3')
+        self.assertEqual(self.ids(response), [p.id for p in self.polls[3:]])
+
+    def test_filter_created_after(self):
+        Poll.objects.filter(id__in=[p.id for p in self.polls[:3]]).update(
+            pub_date=datetime(2018, 1, 1, tzinfo=timezone.utc)
+        )
+        response = self.client.get(
+            '/api/v1/polls?created_after=2019-01-01T00:00:00Z'
+        )
+        self.assertEqual(self.ids(response), [p.id for p in self.polls[3:]])
+
+    def test_invalid_query_returns_400(self):
+        response = self.client.get('/api/v1/polls?limit=0&min_votes=x')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('limit', response.data)
+        self.assertIn('min_votes', response.data)
+
+    def test_ndjson_streams_every_poll(self):
+        response = self.client.get(
+            '/api/v1/polls?limit=2',
+            HTTP_ACCEPT='application/x-ndjson'
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).splitlines()
+        polls = [json.loads(line) for line in lines]
+        self.assertEqual([p['id'] for p in polls], [p.id for p in self.polls])
+        self.assertEqual(len(polls[0]['choices']), 2)
+
+    def test_ndjson_format_parameter(self):
+        response = self.client.get('/api/v1/polls?format=ndjson&min_votes=4')
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 1)
+
+
+class PollsBulkAPITest(TestCase):
+
+    def poll_data(self, i):
+        return {
+            'text': f'Poll {i}',
+            'choices': [{'text': 'A'}, {'text': 'B'}],
+        }
+
+    def test_creates_polls_from_json(self):
+        response = self.client.post(
+            '/api/v1/polls/bulk',
+            data=json.dumps([self.poll_data(i) for i in range(3)]),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Poll.objects.count(), 3)
+        self.assertEqual(Choice.objects.count(), 6)
+        self.assertEqual(
+            [item['uid'] for item in response.data['created']],
+            [poll.uid for poll in Poll.objects.order_by('id')]
+        )
+
+    def test_creates_polls_from_ndjson(self):
+        lines = [json.dumps(self.poll_data(i)) for i in range(3)]
+        response = self.client.post(
+            '/api/v1/polls/bulk',
+            data='\n'.join(lines) + '\n',
+            content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(Poll.objects.order_by('id').values_list('text', flat=True)),
+            ['Poll 0', 'Poll 1', 'Poll 2']
+        )
+
+    def test_reports_invalid_items(self):
+        polls = [
+            self.poll_data(0),
+            {'text': 'One choice', 'choices': [{'text': 'A'}]},
+            self.poll_data(2),
+        ]
+        response = self.client.post(
+            '/api/v1/polls/bulk',
+            data=json.dumps(polls),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item['index'] for item in response.data['created']],
+            [0, 2]
+        )
+        self.assertEqual(len(response.data['errors']), 1)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertEqual(Poll.objects.count(), 2)
+
+    def test_nothing_valid_returns_400(self):
+        response = self.client.post(
+            '/api/v1/polls/bulk',
+            data=json.dumps([{'text': 'No choices'}]),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Poll.objects.exists())
+
+    def test_requires_a_list(self):
+        response = self.client.post(
+            '/api/v1/polls/bulk',
+            data=json.dumps(self.poll_data(0)),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_ndjson_returns_400(self):
+        response = self.client.post(
+            '/api/v1/polls/bulk',
+            data='{"text": ',
+            content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(POLLS_BULK_BATCH_SIZE=2)
+    def test_inserts_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                '/api/v1/polls/bulk',
+                data=json.dumps([self.poll_data(i) for i in range(5)]),
+                content_type='application/json'
+            )
+        inserts = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('INSERT INTO "polls_choice"')
+        ]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Poll.objects.count(), 5)
+
+
 class PollDetailAPITest(TestCase):
 
     def test_can_get_poll_data(self):
@@ -324,3 +749,225 @@ class PollDetailAPITest(TestCase):
                 )
             ]
         })
+
+    def test_unknown_poll_returns_404(self):
+        response = self.client.get('/api/v1/poll/missing')
+        self.assertEqual(response.status_code, 404)
+
+
+class PollDetailAPICacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(text='My poll text')
+        self.choice = Choice.objects.create(text='First', poll=self.poll)
+        Choice.objects.create(text='Second', poll=self.poll)
+        self.url = f'/api/v1/poll/{self.poll.uid}'
+
+    def test_cached_poll_only_queries_votes(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_votes_are_fresh(self):
+        self.client.get(self.url)
+        record_vote(self.poll.uid, self.choice.id)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['choices'][0]['votes'], 1)
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_vote_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        record_vote(self.poll.uid, self.choice.id)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_must_revalidate(self):
+        response = self.client.get(self.url)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+
+class PollResultsAPITest(TestCase):
+
+    def setUp(self):
+        self.poll = Poll.objects.create(text='My poll text')
+        self.first = Choice.objects.create(
+            text='First', poll=self.poll, votes=2
+        )
+        self.second = Choice.objects.create(
+            text='Second', poll=self.poll, votes=5
+        )
+        self.url = f'/api/v1/poll/{self.poll.uid}/results'
+
+    def test_compact_results(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json(), {
+            'total': 7,
+            'choices': [
+                {'id': self.second.id, 'text': 'Second', 'votes': 5,
+                 'color': '#f75f5f'},
+                {'id': self.first.id, 'text': 'First', 'votes': 2,
+                 'color': '#4fef44'},
+            ]
+        })
+
+    def test_unknown_poll_returns_404(self):
+        response = self.client.get('/api/v1/poll/missing/results')
+        self.assertEqual(response.status_code, 404)
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        record_vote(self.poll.uid, self.first.id)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['total'], 8)
+
+    def test_results_page_draws_chart_in_browser(self):
+        with override_settings(POLLS_RESULTS_CHART=dict(
+            settings.POLLS_RESULTS_CHART, MODE='client'
+        )):
+            response = self.client.get(f'/poll/{self.poll.uid}/results')
+        self.assertContains(response, f"fetch('{self.url}')")
+        self.assertContains(
+            response,
+            '<noscript><embed type="image/svg+xml" '
+            f'src="/poll/{self.poll.uid}/results/chart.svg?v='
+        )
+
+    def test_results_page_embeds_chart_by_default(self):
+        response = self.client.get(f'/poll/{self.poll.uid}/results')
+        self.assertNotContains(response, self.url)
+        self.assertNotContains(response, '<noscript>')
+
+
+class PollHistoryAPITest(TestCase):
+
+    def setUp(self):
+        self.poll = Poll.objects.create(text='My poll text')
+        self.first = Choice.objects.create(text='First', poll=self.poll)
+        self.second = Choice.objects.create(text='Second', poll=self.poll)
+        self.url = f'/api/v1/poll/{self.poll.uid}/history'
+
+    def vote(self, choice, at):
+        with patch('polls.models.timezone.now', return_value=at):
+            record_vote(self.poll.uid, choice.id)
+
+    def test_hourly_series(self):
+        self.vote(self.first, datetime(2021, 3, 4, 5, 6, tzinfo=timezone.utc))
+        self.vote(self.first, datetime(2021, 3, 4, 5, 7, tzinfo=timezone.utc))
+        self.vote(
+            self.second, datetime(2021, 3, 4, 7, 0, tzinfo=timezone.utc)
+        )
+        response = self.client.get(self.url, {
+            'since': '2021-03-04T00:00:00Z',
+            'until': '2021-03-05T00:00:00Z',
+        })
+        self.assertEqual(response.json(), {
+            'resolution': 'hour',
+            'since': '2021-03-04T00:00:00Z',
+            'until': '2021-03-05T00:00:00Z',
+            'choices': [
+                {'id': self.first.id, 'text': 'First'},
+                {'id': self.second.id, 'text': 'Second'},
+            ],
+            'series': [
+                {
+                    'start': '2021-03-04T05:00:00Z',
+                    'votes': {str(self.first.id): 2},
+                },
+                {
+                    'start': '2021-03-04T07:00:00Z',
+                    'votes': {str(self.second.id): 1},
+                },
+            ],
+        })
+
+    def test_defaults_to_recent_hours(self):
+        record_vote(self.poll.uid, self.first.id)
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['resolution'], 'hour')
+        self.assertEqual(len(response.json()['series']), 1)
+
+    def test_unknown_poll_returns_404(self):
+        response = self.client.get('/api/v1/poll/missing/history')
+        self.assertEqual(response.status_code, 404)
+
+    def test_bad_resolution_returns_400(self):
+        response = self.client.get(self.url, {'resolution': 'week'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_too_many_buckets_returns_400(self):
+        response = self.client.get(self.url, {
+            'resolution': 'minute',
+            'since': '2021-03-01T00:00:00Z',
+            'until': '2021-03-05T00:00:00Z',
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    query_budgets = {
+        'home': 1,
+        'poll': 2,
+        'results': 2,
+        'results_chart': 1,
+        'api_polls': 2,
+        'api_poll_detail': 3,
+        'api_poll_results': 1,
+        'api_poll_history': 2,
+    }
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            self.poll = Poll.objects.create(text=f'Poll {i}')
+            Choice.objects.bulk_create(
+                Choice(text=f'Choice {j}', poll=self.poll, votes=j)
+                for j in range(5)
+            )
+
+    def test_home(self):
+        self.assertQueryBudget(self.client.get('/'))
+
+    def test_poll(self):
+        self.assertQueryBudget(self.client.get(f'/poll/{self.poll.uid}'))
+
+    def test_results(self):
+        response = self.client.get(f'/poll/{self.poll.uid}/results')
+        self.assertQueryBudget(response)
+
+    def test_results_chart(self):
+        response = self.client.get(
+            f'/poll/{self.poll.uid}/results/chart.svg'
+        )
+        self.assertQueryBudget(response)
+
+    def test_polls_list_api(self):
+        self.assertQueryBudget(self.client.get('/api/v1/polls'))
+
+    def test_poll_detail_api(self):
+        response = self.client.get(f'/api/v1/poll/{self.poll.uid}')
+        self.assertQueryBudget(response)
+
+    def test_poll_results_api(self):
+        response = self.client.get(f'/api/v1/poll/{self.poll.uid}/results')
+        self.assertQueryBudget(response)
+
+    def test_poll_history_api(self):
+        response = self.client.get(f'/api/v1/poll/{self.poll.uid}/history')
+        self.assertQueryBudget(response)
+
+    def test_over_budget(self):
+        self.query_budgets = dict(self.query_budgets, home=0)
+        with self.assertRaisesMessage(
+            AssertionError, 'home ran 1 queries, its budget is 0'
+        ):
+            self.assertQueryBudget(self.client.get('/'))
@@ -0,0 +1,162 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from datetime import datetime, timezone
+from io import StringIO
+from unittest.mock import patch
+from polls.models import Poll, Choice, ChoiceShard
+from polls.serializers import ChoiceSerializer
+from polls.votes import record_vote, compact_shards, reconcile_totals
+
+NOW = datetime(2021, 3, 4, 5, 6, 7, tzinfo=timezone.utc)
+
+
+class RecordVoteTest(TestCase):
+
+    def test_increments_choice(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        record_vote(poll.uid, choice.id)
+        record_vote(poll.uid, choice.id)
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 2)
+
+    def test_only_issues_updates(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        # the first vote in a minute creates its history row
+        with patch('polls.models.timezone.now', return_value=NOW):
+            record_vote(poll.uid, choice.id)
+            with CaptureQueriesContext(connection) as queries:
+                record_vote(poll.uid, choice.id)
+        statements = [
+            q['sql'].split()[0] for q in queries.captured_queries
+            if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))
+        ]
+        self.assertEqual(statements, ['UPDATE', 'UPDATE', 'UPDATE'])
+
+    def test_increments_poll_total(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        record_vote(poll.uid, choice.id)
+        self.assertEqual(Poll.objects.get(id=poll.id).total_votes, 1)
+
+    def test_bumps_poll_version(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        record_vote(poll.uid, choice.id)
+        record_vote(poll.uid, choice.id)
+        self.assertEqual(Poll.objects.get(id=poll.id).version, 2)
+
+    def test_choice_from_another_poll_is_rejected(self):
+        poll = Poll.objects.create(text='A')
+        other_poll = Poll.objects.create(text='B')
+        choice = Choice.objects.create(text='123', poll=other_poll)
+        with self.assertRaises(Choice.DoesNotExist):
+            record_vote(poll.uid, choice.id)
+        self.assertEqual(Choice.objects.get(id=choice.id).votes, 0)
+        self.assertEqual(Poll.objects.get(id=poll.id).total_votes, 0)
+
+    def test_unknown_poll_is_rejected(self):
+        poll = Poll.objects.create(text='A')
+        choice = Choice.objects.create(text='123', poll=poll)
+        with self.assertRaises(Choice.DoesNotExist):
+            record_vote('missing', choice.id)
+
+
+@override_settings(POLLS_VOTE_SHARDS=4)
+class ShardedVoteTest(TestCase):
+
+    def setUp(self):
+        self.poll = Poll.objects.create(text='A')
+        self.choice = Choice.objects.create(text='123', poll=self.poll)
+
+    def vote(self, times):
+        for _ in range(times):
+            record_vote(self.poll.uid, self.choice.id)
+
+    def test_votes_are_spread_over_shards(self):
+        self.vote(40)
+        self.assertEqual(Choice.objects.get(id=self.choice.id).votes, 0)
+        shards = ChoiceShard.objects.filter(choice=self.choice)
+        self.assertGreater(shards.count(), 1)
+        self.assertLessEqual(shards.count(), 4)
+        self.assertEqual(sum(s.votes for s in shards), 40)
+
+    def test_choice_from_another_poll_is_rejected(self):
+        other_poll = Poll.objects.create(text='B')
+        with self.assertRaises(Choice.DoesNotExist):
+            record_vote(other_poll.uid, self.choice.id)
+        self.assertFalse(ChoiceShard.objects.exists())
+
+    def test_with_votes_includes_shards(self):
+        self.choice.votes = 3
+        self.choice.save()
+        self.vote(5)
+        choice = Choice.objects.with_votes().get(id=self.choice.id)
+        self.assertEqual(choice.current_votes, 8)
+
+    def test_poll_total_waits_for_compaction(self):
+        self.vote(5)
+        self.assertEqual(Poll.objects.get(id=self.poll.id).total_votes, 0)
+        compact_shards()
+        self.assertEqual(Poll.objects.get(id=self.poll.id).total_votes, 5)
+
+    def test_serializer_includes_shards(self):
+        self.vote(5)
+        choice = Choice.objects.get(id=self.choice.id)
+        self.assertEqual(ChoiceSerializer(choice).data['votes'], 5)
+
+    def test_results_include_shards(self):
+        self.vote(3)
+        response = self.client.get(f'/poll/{self.poll.uid}/results')
+        self.assertEqual(response.context['poll'].total_votes, 3)
+        self.assertContains(response, '3 Votes')
+
+    def test_compact_folds_shards_into_choice(self):
+        self.vote(25)
+        self.assertEqual(compact_shards(batch_size=2), 25)
+        self.assertEqual(Choice.objects.get(id=self.choice.id).votes, 25)
+        self.assertFalse(ChoiceShard.objects.filter(votes__gt=0).exists())
+        choice = Choice.objects.with_votes().get(id=self.choice.id)
+        self.assertEqual(choice.current_votes, 25)
+
+    def test_compact_command(self):
+        self.vote(2)
+        out = StringIO()
+        call_command('compact_vote_shards', stdout=out)
+        self.assertIn('Compacted 2 votes', out.getvalue())
+
+
+class ReconcileTotalsTest(TestCase):
+
+    def setUp(self):
+        self.polls = []
+        for total in (3, 7, 0, 2):
+            poll = Poll.objects.create(text='A', total_votes=total)
+            Choice.objects.create(text='1', poll=poll, votes=2)
+            Choice.objects.create(text='2', poll=poll, votes=1)
+            self.polls.append(poll)
+        self.empty = Poll.objects.create(text='B', total_votes=4)
+
+    def test_repairs_drift(self):
+        self.assertEqual(reconcile_totals(batch_size=2), (5, 4))
+        totals = Poll.objects.order_by('id').values_list(
+            'total_votes', flat=True
+        )
+        self.assertEqual(list(totals), [3, 3, 3, 3, 0])
+
+    def test_repairs_bump_version(self):
+        reconcile_totals()
+        self.assertEqual(Poll.objects.get(id=self.polls[0].id).version, 0)
+        self.assertEqual(Poll.objects.get(id=self.polls[1].id).version, 1)
+
+    def test_dry_run(self):
+        self.assertEqual(reconcile_totals(repair=False), (5, 4))
+        self.assertEqual(reconcile_totals(repair=False), (5, 4))
+
+    def test_command(self):
+        out = StringIO()
+        call_command('reconcile_vote_totals', '--batch-size', '2', stdout=out)
+        self.assertIn('Checked 5 polls, repaired 4 with drift', out.getvalue())
+        self.assertEqual(reconcile_totals(), (5, 0))
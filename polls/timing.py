@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+_timings = ContextVar('timings', default=None)
+
+
+class Timings:
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = Counter()
+        self.running = set()
+
+    def execute(self, execute, sql, params, many, context):
+        self.queries += 1
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds['db'] += time.perf_counter() - start
+
+    def milliseconds(self):
+        return {
+            name: round(seconds * 1000, 2)
+            for name, seconds in self.seconds.items()
+        }
+
+    def header(self):
+        timings = self.milliseconds()
+        db = timings.pop('db', 0)
+        return ', '.join([
+            f'db;desc="{self.queries} queries";dur={db}',
+            *(f'{name};dur={ms}' for name, ms in timings.items())
+        ])
+
+
+def time_query(execute, sql, params, many, context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings.execute(execute, sql, params, many, context)
+
+
+def time_queries(connection, **kwargs):
+    # every connection counts its queries into the timings of the request
+    # running them, async views run them on threads of their own
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+@contextmanager
+def timed(name):
+    timings = _timings.get()
+    if timings is None or name in timings.running:
+        # templates render widget templates inside them, which are
+        # already counted
+        yield
+        return
+    timings.running.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.seconds[name] += time.perf_counter() - start
+        timings.running.discard(name)
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    # the Django template backend, timing every template it renders
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+class RequestTimingMiddleware:
+    # counts the queries and times the database, templates and charts of
+    # every request, streamed responses are only timed until they start
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # tells Django to await this one instead of giving it a thread
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        timings = Timings()
+        token = _timings.set(timings)
+        try:
+            with timed('total'):
+                response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = Timings()
+        token = _timings.set(timings)
+        try:
+            with timed('total'):
+                response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings):
+        response.timings = timings
+        options = settings.POLLS_REQUEST_TIMING
+        if options['HEADER']:
+            response['Server-Timing'] = timings.header()
+        if options['LOG']:
+            self.log(request, response, timings)
+        return response
+
+    def log(self, request, response, timings):
+        match = request.resolver_match
+        fields = {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': timings.queries,
+            **{
+                f'{name}_ms': ms
+                for name, ms in timings.milliseconds().items()
+            },
+        }
+        logger.info(
+            ' '.join(f'{name}=%s' for name in fields),
+            *fields.values(),
+            extra={'timings': fields}
+        )
@@ -1,14 +1,51 @@
+from importlib import import_module
 from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
 from polls import views
 
+
+def api_view(name):
+    # polls.api and rest_framework are imported by the first API request
+    # rather than with the URLconf, so workers only serving pages skip them
+    view = None
+
+    @csrf_exempt
+    def load(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = getattr(import_module('polls.api'), name).as_view()
+        return view(request, *args, **kwargs)
+    return load
+
+
 urlpatterns = [
     path('', views.HomeView.as_view(), name='home'),
     path('poll/<uid>', views.PollView.as_view(), name='poll'),
     path('poll/<uid>/results', views.ResultsView.as_view(), name='results'),
-    path('api/v1/polls', views.PollsListAPIView.as_view(), name='api_polls'),
+    path(
+        'poll/<uid>/results/chart.svg',
+        views.ResultsChartView.as_view(),
+        name='results_chart'
+    ),
+    path('api/v1/polls', api_view('PollsListAPIView'), name='api_polls'),
+    path(
+        'api/v1/polls/bulk',
+        api_view('PollsBulkAPIView'),
+        name='api_polls_bulk'
+    ),
     path(
         'api/v1/poll/<uid>',
-        views.PollDetailAPIView.as_view(),
+        api_view('PollDetailAPIView'),
         name='api_poll_detail'
     ),
+    path(
+        'api/v1/poll/<uid>/results',
+        api_view('PollResultsAPIView'),
+        name='api_poll_results'
+    ),
+    path(
+        'api/v1/poll/<uid>/history',
+        api_view('PollHistoryAPIView'),
+        name='api_poll_history'
+    ),
 ]
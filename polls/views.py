@@ -1,14 +1,37 @@
+import hashlib
+import secrets
 from django.views.generic import View, FormView
 from django.shortcuts import render, redirect
-from django.db.models import Sum
-from pygal import Pie
-from pygal.style import Style
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status
-from polls.models import Poll, Choice
+from django.conf import settings
+from django.contrib import messages
+from django.http import Http404, HttpResponse
+from django.middleware.csrf import get_token
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from polls.archive import get_archived_results
+from polls.cache import (
+    cache_archived_data,
+    get_live_poll_data,
+    get_ranked_choices,
+    get_votes,
+    vote_stamp,
+)
+from polls.charts import choice_color, get_chart
+from polls.dedup import (
+    DuplicateVote,
+    VOTER_COOKIE,
+    address_fingerprints,
+    get_voter,
+    record_unique_vote,
+    voter_fingerprint,
+)
+from polls.models import ArchivedPoll, Poll, Choice
 from polls.forms import NewPollForm
-from polls.serializers import PollSerializer
+from polls.live import live_results_url
+from polls.votes import record_vote
+
+ALREADY_VOTED = 'You have already voted on this poll'
+POLL_CLOSED = 'This poll is closed'
 
 
 class HomeView(FormView):
@@ -20,83 +43,185 @@ class HomeView(FormView):
         return redirect('poll', uid=form.poll.uid)
 
     def get_context_data(self, **kwargs):
-        kwargs['popular'] = Poll.objects.annotate(
-            total_votes=Sum('choices__votes')
-        ).order_by('-total_votes')[:10]
+        kwargs['popular'] = Poll.objects.order_by('-total_votes')[:10]
+        kwargs['fragment_timeout'] = (
+            settings.POLLS_POLL_CACHE['FRAGMENT_TIMEOUT']
+        )
         return super().get_context_data(**kwargs)
 
 
+def get_poll_data_or_404(uid):
+    try:
+        return get_live_poll_data(uid)
+    except (Poll.DoesNotExist, ArchivedPoll.DoesNotExist):
+        raise Http404('Poll not found')
+
+
+def cast_vote(request, uid, choice_id):
+    # returns the message for votes that are not counted
+    try:
+        if settings.POLLS_VOTE_DEDUP['ENABLED']:
+            record_unique_vote(
+                uid,
+                choice_id,
+                voter_fingerprint(request, uid),
+                address_fingerprints(request, uid)
+            )
+        else:
+            record_vote(uid, choice_id)
+    except (Choice.DoesNotExist, ValueError):
+        if ArchivedPoll.objects.filter(uid=uid).exists():
+            return POLL_CLOSED
+        raise Http404('Choice not found for this poll')
+    except DuplicateVote:
+        return ALREADY_VOTED
+    return None
+
+
+def record_vote_or_404(request, uid, choice_id):
+    error = cast_vote(request, uid, choice_id)
+    if error:
+        messages.error(request, error)
+
+
+def poll_page(request, data):
+    # the page has no vote counts, so it only changes with the poll and
+    # the csrf cookie its form token belongs to. get_token also sends the
+    # cookie with a 304, a browser that lost it would fail to vote.
+    get_token(request)
+    csrf = hashlib.blake2b(
+        request.META['CSRF_COOKIE'].encode(), digest_size=8
+    ).hexdigest()
+    archived = data.get('archived', False)
+    etag = f'"{data["uid"]}:{csrf}:archived"' if archived else (
+        f'"{data["uid"]}:{csrf}"'
+    )
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        poll = Poll(id=data['id'], uid=data['uid'], text=data['text'])
+        response = render(request, 'poll.html', {
+            'poll': poll,
+            'choices': data['choices'],
+            'archived': archived,
+            'fragment_timeout': settings.POLLS_POLL_CACHE['FRAGMENT_TIMEOUT'],
+        })
+    response['ETag'] = etag
+    if get_voter(request) is None:
+        response.set_signed_cookie(
+            VOTER_COOKIE,
+            secrets.token_urlsafe(16),
+            max_age=60 * 60 * 24 * 365,
+            httponly=True,
+            samesite='Lax'
+        )
+    patch_cache_control(
+        response,
+        private=True,
+        max_age=settings.POLLS_POLL_CACHE['MAX_AGE']
+    )
+    return response
+
+
 class PollView(View):
 
     def get(self, request, uid):
-        poll = Poll.objects.get(uid=uid)
-        return render(request, 'poll.html', {'poll': poll})
+        return poll_page(request, get_poll_data_or_404(uid))
 
     def post(self, request, uid):
-        poll = Poll.objects.get(uid=uid)
-        choice = Choice.objects.get(id=request.POST['choice_id'])
-        choice.votes += 1
-        choice.save()
-
-        return redirect('results', uid=poll.uid)
+        record_vote_or_404(request, uid, request.POST.get('choice_id'))
+        return redirect('results', uid=uid)
 
 
-class ResultsView(View):
-
-    colors = (
-        '#f75f5f', '#4fef44', '#44efe5',
-        '#c844ef', '#ef4488', '#e8f562',
-        '#f5b762', '#6286f5'
-    )
-    custom_style = Style(
-        background='transparent',
-        plot_background='#2b2b2b',
-        foreground='white',
-        foreground_strong='white',
-        foreground_subtle='white',
-        transition='100ms ease-in',
-        opacity_hover='.25',
-        tooltip_font_size=22,
-        colors=colors
+def get_results(uid):
+    try:
+        poll = Poll.objects.get(uid=uid)
+    except Poll.DoesNotExist:
+        try:
+            return get_archived_results(uid)
+        except ArchivedPoll.DoesNotExist:
+            raise Http404('Poll not found')
+    return poll, get_ranked_choices(poll)
+
+
+def get_result_choices(uid):
+    choices = list(
+        Choice.objects.with_votes().filter(
+            poll__uid=uid
+        ).order_by('-current_votes', 'id')
     )
+    if not choices:
+        try:
+            _, choices = get_archived_results(uid)
+        except ArchivedPoll.DoesNotExist:
+            raise Http404('Poll not found')
+    return choices
+
+
+def results_page(request, poll, choices):
+    for i, choice in enumerate(choices):
+        choice.color = choice_color(i)
+
+    poll.color_choices = choices
+    poll.total_votes = sum(c.current_votes for c in choices)
+
+    chart_url = reverse('results_chart', kwargs={'uid': poll.uid})
+    stamp = vote_stamp((c.id, c.current_votes) for c in choices)
+    live = settings.POLLS_LIVE_RESULTS['ENABLED'] and not poll.archived
+    client_chart = settings.POLLS_RESULTS_CHART['MODE'] == 'client'
+    return render(request, 'results.html', {
+        'poll': poll,
+        'chart': f'{chart_url}?v={stamp}',
+        'live': live and live_results_url(poll.uid),
+        'results_api': client_chart and reverse(
+            'api_poll_results', kwargs={'uid': poll.uid}
+        ),
+        'fragment_timeout': settings.POLLS_POLL_CACHE['FRAGMENT_TIMEOUT'],
+    })
 
-    def get(self, request, uid):
-        poll = Poll.objects.annotate(
-            total_votes=Sum('choices__votes')
-        ).get(uid=uid)
-
-        pie_chart = Pie(style=self.custom_style)
-        choices = poll.choices.all().order_by('-votes')
-        for i, choice in enumerate(choices):
-            pie_chart.add(choice.text, choice.votes)
-            choice.color = self.colors[i]
-
-        poll.color_choices = choices
-
-        return render(request, 'results.html', {
-            'poll': poll,
-            'chart': pie_chart.render_data_uri()
-        })
-
-
-class PollsListAPIView(APIView):
 
-    def get(self, request):
-        polls = Poll.objects.all()
-        serializer = PollSerializer(polls, many=True)
-        return Response(serializer.data)
+class ResultsView(View):
 
-    def post(self, request):
-        serializer = PollSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    def get(self, request, uid):
+        return results_page(request, *get_results(uid))
 
 
-class PollDetailAPIView(APIView):
+class ResultsChartView(View):
 
     def get(self, request, uid):
-        poll = Poll.objects.get(uid=uid)
-        serializer = PollSerializer(poll)
-        return Response(serializer.data)
+        choices = get_result_choices(uid)
+        stamp, svg = get_chart(uid, choices)
+        etag = f'"{stamp}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(svg, content_type='image/svg+xml')
+        response['ETag'] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.POLLS_RESULTS_CHART['STALE_SECONDS']
+        )
+        return response
+
+
+def get_poll_detail(uid):
+    data = get_poll_data_or_404(uid)
+    if not data.get('archived'):
+        votes = get_votes(data['id'])
+        if not votes:
+            # a live poll always has choices, these went to the archive
+            try:
+                data = cache_archived_data(uid)
+            except ArchivedPoll.DoesNotExist:
+                raise Http404('Poll not found')
+    if data.pop('archived', False):
+        votes = {choice['id']: choice['votes'] for choice in data['choices']}
+    else:
+        for choice in data['choices']:
+            choice['votes'] = votes.get(choice['id'], 0)
+    return data, f'"{vote_stamp(votes.items())}"'
+
+
+def cache_poll_detail(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,129 @@
+import random
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from polls.buffer import get_vote_buffer
+from polls.models import Poll, Choice, ChoiceShard, VoteCount
+
+
+def record_vote(uid, choice_id):
+    if settings.POLLS_VOTE_BUFFER['ENABLED']:
+        record_buffered_vote(uid, choice_id)
+        return
+    if settings.POLLS_VOTE_SHARDS:
+        record_sharded_vote(uid, choice_id, settings.POLLS_VOTE_SHARDS)
+        return
+
+    # the choice UPDATE both checks the choice belongs to the poll and
+    # increments the counter in the database, so concurrent voters
+    # can never overwrite each other's votes
+    with transaction.atomic():
+        updated = Choice.objects.filter(
+            id=choice_id,
+            poll__uid=uid
+        ).update(votes=F('votes') + 1)
+        if not updated:
+            raise Choice.DoesNotExist(
+                f'Choice {choice_id} does not belong to poll {uid}'
+            )
+        Poll.objects.filter(uid=uid).update(
+            total_votes=F('total_votes') + 1,
+            version=F('version') + 1,
+            last_vote=timezone.now()
+        )
+        VoteCount.objects.record({(uid, int(choice_id)): 1})
+
+
+def record_buffered_vote(uid, choice_id):
+    if not Choice.objects.filter(id=choice_id, poll__uid=uid).exists():
+        raise Choice.DoesNotExist(
+            f'Choice {choice_id} does not belong to poll {uid}'
+        )
+    get_vote_buffer().add(int(choice_id))
+
+
+def record_sharded_vote(uid, choice_id, shards):
+    slot = random.randrange(shards)
+    updated = ChoiceShard.objects.filter(
+        choice_id=choice_id,
+        choice__poll__uid=uid,
+        slot=slot
+    ).update(votes=F('votes') + 1)
+    if updated:
+        return
+
+    # first vote to land on this slot, so the shard row needs creating
+    if not Choice.objects.filter(id=choice_id, poll__uid=uid).exists():
+        raise Choice.DoesNotExist(
+            f'Choice {choice_id} does not belong to poll {uid}'
+        )
+    shard, created = ChoiceShard.objects.get_or_create(
+        choice_id=choice_id,
+        slot=slot,
+        defaults={'votes': 1}
+    )
+    if not created:
+        ChoiceShard.objects.filter(id=shard.id).update(
+            votes=F('votes') + 1
+        )
+
+
+def compact_shards(batch_size=500):
+    folded = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            shards = list(
+                ChoiceShard.objects.select_for_update().filter(
+                    id__gt=last_id,
+                    votes__gt=0
+                ).order_by('id')[:batch_size]
+            )
+            if not shards:
+                return folded
+
+            choice_votes = Counter()
+            for shard in shards:
+                choice_votes[shard.choice_id] += shard.votes
+            Choice.objects.add_votes(choice_votes)
+            ChoiceShard.objects.filter(
+                id__in=[shard.id for shard in shards]
+            ).update(votes=0)
+
+        folded += sum(choice_votes.values())
+        last_id = shards[-1].id
+
+
+def reconcile_totals(batch_size=1000, repair=True):
+    # compare Poll.total_votes with its choices a batch of polls at a time,
+    # the polls stay locked while they are counted so votes that are in
+    # flight wait instead of showing up as drift
+    checked = drifted = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            polls = dict(
+                Poll.objects.select_for_update().filter(
+                    id__gt=last_id
+                ).order_by('id').values_list('id', 'total_votes')[:batch_size]
+            )
+            if not polls:
+                return checked, drifted
+
+            counted = dict(
+                Choice.objects.filter(poll_id__in=polls).order_by().values(
+                    'poll_id'
+                ).annotate(total=Sum('votes')).values_list('poll_id', 'total')
+            )
+            wrong = [
+                poll_id for poll_id, total in polls.items()
+                if counted.get(poll_id, 0) != total
+            ]
+            if repair and wrong:
+                Poll.objects.filter(id__in=wrong).recount_votes()
+
+        checked += len(polls)
+        drifted += len(wrong)
+        last_id = max(polls)
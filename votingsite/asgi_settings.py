@@ -0,0 +1,12 @@
+"""
+Django settings for the votingsite ASGI deployment.
+
+Identical to votingsite.settings apart from routing to the async views
+and turning on live results.
+"""
+
+from votingsite.settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = 'votingsite.asgi_urls'
+
+POLLS_LIVE_RESULTS = dict(POLLS_LIVE_RESULTS, ENABLED=True)  # noqa: F405
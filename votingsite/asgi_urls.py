@@ -0,0 +1,14 @@
+"""votingsite URL Configuration for the ASGI deployment
+
+Serves the same site as votingsite.urls, with the async versions of the
+vote, results and poll detail API views.
+"""
+from django.urls import path, include
+
+from polls import async_urls
+from votingsite import urls
+
+# the async views come first so they take over the matching paths
+urlpatterns = [
+    path('', include(async_urls)),
+] + urls.urlpatterns
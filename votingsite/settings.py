@@ -22,14 +22,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.forms',
     'rest_framework',
     'polls',
 ]
 
 MIDDLEWARE = [
+    'polls.timing.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'polls.ratelimit.RateLimitMiddleware',
+    'polls.replicas.ReplicaMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -39,10 +43,17 @@ ROOT_URLCONF = 'votingsite.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'polls.timing.TimedDjangoTemplates',
         'DIRS': ['polls/templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # compiled templates are kept, runserver resets them when a
+            # template changes
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -52,7 +63,14 @@ TEMPLATES = [
     },
 ]
 
+# form widgets render with the templates above, so they are compiled once
+# as well instead of on every render when DEBUG is on
+FORM_RENDERER = 'django.forms.renderers.TemplatesSetting'
+
 WSGI_APPLICATION = 'votingsite.wsgi.application'
+ASGI_APPLICATION = 'votingsite.asgi.application'
+
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
 # Internationalization
 LANGUAGE_CODE = 'en-us'
@@ -64,12 +82,49 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 
+# Connections stay open for DATABASE_CONN_MAX_AGE seconds and are reused
+# by later requests rather than connecting for every request, 0 closes
+# them at the end of each request.
+CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', 600))
+
 DATABASES = {
     'default': dj_database_url.config(
-        default='postgres://postgres:@localhost:5432/votingapp'
+        default='postgres://postgres:@localhost:5432/votingapp',
+        conn_max_age=CONN_MAX_AGE
     )
 }
 
+# With DATABASE_POOL=1 postgres connections come from a pool per process
+# instead, each thread returns its connection at the end of every request.
+# The pool opens at most MAX_SIZE connections, waits up to TIMEOUT seconds
+# for one to be returned when they are all in use, and checks connections
+# idle for more than CHECK_AFTER seconds still work before reusing them.
+DATABASE_POOL = {
+    'MAX_SIZE': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+    'TIMEOUT': 10,
+    'CHECK_AFTER': 30,
+}
+
+# Read only replicas of the default database, as comma separated database
+# urls in DATABASE_REPLICA_URLS. Tests read them from the default database.
+REPLICA_URLS = os.environ.get('DATABASE_REPLICA_URLS', '')
+for i, url in enumerate(filter(None, REPLICA_URLS.split(','))):
+    DATABASES[f'replica{i + 1}'] = dict(
+        dj_database_url.parse(url.strip(), conn_max_age=CONN_MAX_AGE),
+        TEST={'MIRROR': 'default'}
+    )
+
+if os.environ.get('DATABASE_POOL') == '1':
+    for database in DATABASES.values():
+        if 'postgresql' in database['ENGINE']:
+            database.update(
+                ENGINE='polls.db.backends.postgresql',
+                CONN_MAX_AGE=0,
+                POOL=DATABASE_POOL
+            )
+
+DATABASE_ROUTERS = ['polls.replicas.ReplicaRouter']
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
@@ -77,6 +132,158 @@ REST_FRAMEWORK = {
     'UNAUTHENTICATED_USER': None,
 }
 
+# Polls created through api/v1/polls/bulk are inserted this many at a time,
+# each batch in its own transaction.
+POLLS_BULK_BATCH_SIZE = 1000
+
+# Spread each choice's votes over this many counter rows so a viral poll
+# does not queue every voter on one row lock, 0 disables sharding.
+# Run the compact_vote_shards command periodically while it is enabled.
+POLLS_VOTE_SHARDS = int(os.environ.get('POLLS_VOTE_SHARDS', 0))
+
+# Rendered results charts are cached for TIMEOUT seconds. When votes come
+# in, the previous chart keeps being served for up to STALE_SECONDS before
+# it is rendered again, so a hot poll is not re-rendered on every vote.
+# With MODE 'client' browsers draw the chart from api/v1/poll/<uid>/results
+# and the rendered chart is only served to browsers without javascript.
+# RENDERER 'svg' draws the chart with polls.svg, 'pygal' with pygal.
+POLLS_RESULTS_CHART = {
+    'MODE': os.environ.get('POLLS_RESULTS_CHART', 'server'),
+    'RENDERER': os.environ.get('POLLS_CHART_RENDERER', 'svg'),
+    'STALE_SECONDS': 2,
+    'TIMEOUT': 60 * 60,
+}
+
+# A poll's text and choices are cached for TIMEOUT seconds once serialized,
+# and browsers may reuse a poll page for MAX_AGE seconds. The rendered
+# choices, share links and blank new poll form are cached for
+# FRAGMENT_TIMEOUT seconds, 0 renders them every time.
+POLLS_POLL_CACHE = {
+    'TIMEOUT': 60 * 60 * 24,
+    'MAX_AGE': 60,
+    'FRAGMENT_TIMEOUT': 60 * 60 * 24,
+}
+
+# Buffer votes in each worker and write them in batched UPDATEs instead of
+# one UPDATE per vote. MAX_PENDING bounds how many votes a worker holds
+# before flushing immediately, JOURNAL_DIR additionally appends every vote
+# to a file so the drain_vote_buffer command can recover crashed workers.
+POLLS_VOTE_BUFFER = {
+    'ENABLED': os.environ.get('POLLS_VOTE_BUFFER') == '1',
+    'FLUSH_INTERVAL': 0.25,
+    'MAX_PENDING': 1000,
+    'JOURNAL_DIR': os.environ.get('POLLS_VOTE_JOURNAL_DIR'),
+    'FSYNC': False,
+}
+
+# With POLLS_VOTE_DEDUP=1 only count one vote per poll from each voter,
+# told apart by a cookie or their address, and at most VOTES_PER_ADDRESS
+# from each address. Each worker remembers the voters of its MAX_POLLS most
+# recently voted on polls in bloom filters sized for CAPACITY voters at
+# FALSE_POSITIVE_RATE, and only asks the database when a filter matches.
+POLLS_VOTE_DEDUP = {
+    'ENABLED': os.environ.get('POLLS_VOTE_DEDUP') == '1',
+    'VOTES_PER_ADDRESS': int(
+        os.environ.get('POLLS_VOTES_PER_ADDRESS', 20)
+    ),
+    'CAPACITY': 10000,
+    'FALSE_POSITIVE_RATE': 0.001,
+    'MAX_POLLS': 1000,
+}
+
+# Keep a history of votes per choice, counted per minute. The
+# roll_up_vote_history command rolls minutes older than MINUTE_RETENTION
+# seconds up into hours, hours older than HOUR_RETENTION into days, and
+# deletes days older than DAY_RETENTION, None keeps them forever.
+POLLS_VOTE_HISTORY = {
+    'ENABLED': True,
+    'MINUTE_RETENTION': 60 * 60 * 24 * 2,
+    'HOUR_RETENTION': 60 * 60 * 24 * 90,
+    'DAY_RETENTION': None,
+}
+
+# The archive_polls command moves polls nobody has voted on for AFTER
+# seconds out of the poll and choice tables into one ArchivedPoll row
+# each, from where their pages and the detail API serve them read only.
+POLLS_ARCHIVE = {
+    'AFTER': 60 * 60 * 24 * 180,
+}
+
+# How many proxies in front of the site append to X-Forwarded-For, used to
+# find a client's address for rate limiting and duplicate votes.
+POLLS_TRUSTED_PROXIES = int(os.environ.get('POLLS_TRUSTED_PROXIES', 0))
+
+# Token bucket rate limits per client address. Each rule allows RATE
+# requests a second with bursts of up to BURST to the named VIEWS, for the
+# given METHODS. Buckets are kept in the CACHE alias, which needs to be a
+# shared cache for the limits to hold across workers.
+POLLS_RATE_LIMITS = {
+    'ENABLED': os.environ.get('POLLS_RATE_LIMITS') == '1',
+    'CACHE': 'default',
+    'RULES': {
+        'vote': {
+            'VIEWS': ['poll'],
+            'METHODS': ['POST'],
+            'RATE': 1,
+            'BURST': 20,
+        },
+        'create': {
+            'VIEWS': ['home', 'api_polls', 'api_polls_bulk'],
+            'METHODS': ['POST'],
+            'RATE': 0.1,
+            'BURST': 10,
+        },
+        'read_api': {
+            'VIEWS': [
+                'api_polls',
+                'api_poll_detail',
+                'api_poll_results',
+                'api_poll_history',
+            ],
+            'METHODS': ['GET', 'HEAD'],
+            'RATE': 20,
+            'BURST': 100,
+        },
+    },
+}
+
+# Push vote counts to results pages watching a poll over server sent
+# events, served by the ASGI deployment. Counts are read once every TICK
+# seconds per watched poll and handed to BROKER to fan out, KEEPALIVE is
+# how often an idle stream sends a comment to keep the connection open.
+POLLS_LIVE_RESULTS = {
+    'ENABLED': False,
+    'BROKER': 'polls.live.InProcessBroker',
+    'TICK': 1,
+    'KEEPALIVE': 15,
+}
+
+# Every request is timed by polls.timing.RequestTimingMiddleware, HEADER
+# sends the query count and timings back in a Server-Timing header and LOG
+# writes them to the polls.timing logger.
+POLLS_REQUEST_TIMING = {
+    'HEADER': True,
+    'LOG': True,
+}
+
+# GET requests to VIEWS read from one of the replica ALIASES at random.
+# A client that votes or creates a poll reads from the primary for the
+# next PIN_SECONDS so it sees its own changes despite replication lag.
+POLLS_READ_REPLICAS = {
+    'ALIASES': [alias for alias in DATABASES if alias != 'default'],
+    'PIN_SECONDS': 10,
+    'VIEWS': [
+        'home',
+        'poll',
+        'results',
+        'results_chart',
+        'api_polls',
+        'api_poll_detail',
+        'api_poll_results',
+        'api_poll_history',
+    ],
+}
+
 # Load secrets and environment specific settings based on which
 # environment we are currently in
 # Note: The following is ignored by coverage reports.
@@ -98,6 +305,10 @@ elif 'HEROKU' in os.environ:  # noqa
 
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+    # the heroku router is the one proxy in front of the site
+    POLLS_TRUSTED_PROXIES = 1
+    POLLS_RATE_LIMITS['ENABLED'] = True
+
     STATICFILES_STORAGE = 'whitenoise.django.GzipManifestStaticFilesStorage'
     MIDDLEWARE.append('whitenoise.middleware.WhiteNoiseMiddleware')
 
@@ -114,6 +325,10 @@ elif 'HEROKU' in os.environ:  # noqa
                 'handlers': ['console'],
                 'level': 'INFO',
             },
+            'polls.timing': {
+                'handlers': ['console'],
+                'level': 'INFO',
+            },
         },
     }
 